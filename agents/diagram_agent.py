@@ -4,67 +4,94 @@ This module generates Mermaid JS class diagrams that visualize architectural
 changes and structural modifications detected in the PR diff.
 
 Uses Llama 3.3 70B (MODEL_HEAVY) for high-precision Mermaid syntax generation
-with built-in validation and error correction capabilities.
+with built-in validation and error correction capabilities. Diffs with only a
+few added classes/functions go to Llama 3.1 8B (MODEL_FAST), and diffs with
+none skip the LLM call entirely.
 """
 
 import os
 import re
+import asyncio
 import logging
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+import utils.env  # noqa: F401  (loads .env once per process)
 from core.state import AgentState
-from utils.common import DIAGRAM_PROMPT
-
-load_dotenv()
+from utils.mermaid import is_valid_mermaid_diagram
+from utils.prompt import build_messages, truncate_for_context
+from utils.llm import get_llm
+from utils.llm_cache import cached_invoke, cached_ainvoke
 
 logger = logging.getLogger(__name__)
 
-
-# DIAGRAM_PROMPT is defined in utils/common.py to keep prompts centralized
-
-
-def is_valid_mermaid_diagram(diagram_text: str) -> bool:
+# Added lines that introduce classes/functions/types, with optional leading
+# modifiers (export class, async def, pub struct, data class, ...) and Go's
+# "type Foo struct"; a diff without any of them has no architecture to draw.
+# Decorators are not counted: the decorated def/class line is.
+_STRUCTURE_RE = re.compile(
+    r"^\+\s*(?:"
+    r"(?:(?:export|public|private|protected|abstract|async|pub|data|final"
+    r"|static)\s+)*(?:class|def|interface|struct)\s"
+    r"|type\s+\w+\s+(?:struct|interface)\b"
+    r")",
+    re.MULTILINE,
+)
+
+# Fallback for unfenced output: everything from "classDiagram" up to a
+# closing fence or the end of the text
+_CLASS_DIAGRAM_RE = re.compile(
+    r"(classDiagram.*?)(?:\n```|$)", re.DOTALL | re.IGNORECASE
+)
+
+# First line that opens a diagram (leading whitespace allowed)
+_DIAGRAM_START_RE = re.compile(r"^\s*(?:classDiagram|graph)", re.MULTILINE)
+
+# Below this many structural edits the diagram is small enough for 8B
+_FAST_MODEL_MAX_EDITS = 5
+
+# Sample temperatures for the async node. The first is always requested; the
+# rest are requested in parallel only if it fails validation.
+_SAMPLE_TEMPERATURES = (0.0, 0.3, 0.7)
+
+
+def _select_model(pr_diff: str) -> str | None:
     """
-    Validates that the diagram contains proper Mermaid classDiagram syntax.
+    Picks the model for the diagram based on how structural the diff is.
 
     Args:
-        diagram_text: The diagram text to validate.
+        pr_diff: The PR diff to visualize.
 
     Returns:
-        bool: True if the diagram appears to be valid Mermaid code.
+        str | None: MODEL_FAST for a handful of structural edits, MODEL_HEAVY
+        for larger ones, or None when nothing structural was added.
 
-    Checks:
-        - Presence of 'classDiagram' keyword
-        - Proper closing of all braces
-        - Absence of common error patterns
+    Example:
+        >>> _select_model("+x = 1") is None
+        True
+        >>> _select_model("+class User:")
+        'llama-3.1-8b-instant'
     """
-    if not diagram_text:
-        return False
-
-    # Check for classDiagram or graph keyword
-    has_diagram_type = "classDiagram" in diagram_text or "graph" in diagram_text
+    edits = 0
+    for _ in _STRUCTURE_RE.finditer(pr_diff):
+        edits += 1
+        if edits >= _FAST_MODEL_MAX_EDITS:
+            return os.getenv("MODEL_HEAVY", "llama-3.3-70b-versatile")
 
-    # Count braces to ensure they're balanced
-    open_braces = diagram_text.count("{")
-    close_braces = diagram_text.count("}")
+    if edits == 0:
+        return None
+    return os.getenv("MODEL_FAST", "llama-3.1-8b-instant")
 
-    # Basic validation: must have diagram type and balanced braces
-    if not has_diagram_type or open_braces != close_braces:
-        return False
 
-    # Check for common error patterns
-    error_patterns = [
-        r"^Error:",  # Error messages
-        r"^I apologize",  # Apology responses
-        r"^I cannot",  # Refusal responses
-        r"^I don't",  # Refusal responses
-    ]
+# Static part of the user prompt, identical for every diagram request
+_DIAGRAM_INSTRUCTIONS = (
+    "Analyze the following code changes and generate a Mermaid class diagram\n"
+    "that visualizes the architectural modifications.\n"
+    "Generate ONLY valid Mermaid classDiagram code. No explanations, "
+    "no comments inside the diagram."
+)
 
-    for pattern in error_patterns:
-        if re.search(pattern, diagram_text, re.MULTILINE | re.IGNORECASE):
-            return False
-
-    return True
+# DIAGRAM_PROMPT (and its prebuilt system message) is defined in
+# utils/common.py to keep prompts centralized
+# is_valid_mermaid_diagram lives in utils/mermaid.py so the supervisor
+# shares the same (memoized) validator
 
 
 def sanitize_diagram(diagram_text: str) -> str:
@@ -85,41 +112,31 @@ def sanitize_diagram(diagram_text: str) -> str:
     if not diagram_text:
         return ""
 
-    # Try to extract from markdown code block
-    mermaid_block = re.search(
-        r"```(?:mermaid)?\s*\n?(.*?)\n?```",
-        diagram_text,
-        re.DOTALL | re.IGNORECASE,
-    )
-
-    if mermaid_block:
-        cleaned = mermaid_block.group(1).strip()
+    # Try to extract from markdown code block (```mermaid ... ```) with
+    # literal finds instead of a backtracking DOTALL regex
+    block = None
+    fence = diagram_text.find("```")
+    if fence >= 0:
+        body_start = fence + 3
+        if diagram_text[body_start : body_start + 7].lower() == "mermaid":
+            body_start += 7
+        body_end = diagram_text.find("```", body_start)
+        if body_end >= 0:
+            block = diagram_text[body_start:body_end]
+
+    if block is not None:
+        cleaned = block.strip()
     else:
         # If no code block, try to find the classDiagram section
-        classDiagram_match = re.search(
-            r"(classDiagram.*?)(?:\n```|$)",
-            diagram_text,
-            re.DOTALL | re.IGNORECASE,
-        )
+        classDiagram_match = _CLASS_DIAGRAM_RE.search(diagram_text)
         if classDiagram_match:
             cleaned = classDiagram_match.group(1).strip()
         else:
             cleaned = diagram_text.strip()
 
-    # Remove any explanatory text before or after
-    lines = cleaned.split("\n")
-    diagram_lines = []
-    in_diagram = False
-
-    for line in lines:
-        # Start collecting when we see classDiagram or graph
-        if re.match(r"^\s*(classDiagram|graph)", line):
-            in_diagram = True
-
-        if in_diagram:
-            diagram_lines.append(line)
-
-    result = "\n".join(diagram_lines).strip()
+    # Drop explanatory text before the first classDiagram/graph line
+    start_match = _DIAGRAM_START_RE.search(cleaned)
+    result = cleaned[start_match.start() :].strip() if start_match else ""
 
     # Final validation
     if is_valid_mermaid_diagram(result):
@@ -129,12 +146,60 @@ def sanitize_diagram(diagram_text: str) -> str:
         return ""
 
 
+def _build_messages(pr_diff: str) -> list:
+    """
+    Builds the chat messages for a single diagram generation request.
+
+    Args:
+        pr_diff: The PR diff to visualize.
+
+    Returns:
+        list: System and user messages ready for the LLM.
+
+    Example:
+        >>> _build_messages("diff --git a/models.py...")[0]["role"]
+        'system'
+    """
+    # Prepare context window (keep it focused)
+    diff_context = truncate_for_context(pr_diff, 8000)
+
+    return build_messages("diagram", _DIAGRAM_INSTRUCTIONS, diff_context)
+
+
+def _to_state_update(raw_diagram: str) -> dict:
+    """
+    Sanitizes the raw LLM output into the node's state update.
+
+    Args:
+        raw_diagram: The raw diagram text returned by the LLM.
+
+    Returns:
+        dict: 'architecture_diagram' with the fenced Mermaid code, or an
+        empty string if the output failed validation.
+
+    Example:
+        >>> _to_state_update("I cannot help with that.")
+        {'architecture_diagram': ''}
+    """
+    cleaned_diagram = sanitize_diagram(raw_diagram)
+
+    if cleaned_diagram:
+        logger.info("diagram_node: Diagram generated and validated successfully")
+        # Wrap in markdown code block for GitHub rendering
+        final_diagram = f"```mermaid\n{cleaned_diagram}\n```"
+        return {"architecture_diagram": final_diagram}
+    else:
+        logger.warning("diagram_node: Generated diagram failed validation")
+        return {"architecture_diagram": ""}
+
+
 def diagram_node(state: AgentState) -> dict:
     """
     Generates a Mermaid JS class diagram representing architectural changes.
 
     This agent analyzes the PR diff for structural changes and generates
-    a visual representation using Mermaid class diagram syntax.
+    a visual representation using Mermaid class diagram syntax. Diffs that
+    add no classes or functions return an empty diagram without an LLM call.
 
     Args:
         state: The shared AgentState containing pr_diff to analyze.
@@ -155,44 +220,127 @@ def diagram_node(state: AgentState) -> dict:
             logger.warning("diagram_node: No PR diff provided")
             return {"architecture_diagram": ""}
 
-        # Use the heavy model (Llama 3.3 70B) for precise Mermaid syntax
-        model_name = os.getenv("MODEL_HEAVY", "llama-3.3-70b-versatile")
-        llm = ChatGroq(temperature=0, model_name=model_name)
+        # Skip the LLM entirely when no class/function was added
+        model_name = _select_model(pr_diff)
+        if model_name is None:
+            logger.info("diagram_node: No structural changes, skipping diagram")
+            return {"architecture_diagram": ""}
 
-        # Prepare context window (keep it focused)
-        diff_context = (
-            pr_diff[:8000] + "\n...(truncated for context)"
-            if len(pr_diff) > 8000
-            else pr_diff
+        response = cached_invoke(
+            get_llm(model_name), _build_messages(pr_diff), model_name
         )
+        return _to_state_update(response.content)
 
-        user_prompt = f"""Analyze the following code changes and generate a Mermaid class diagram
-that visualizes the architectural modifications:
+    except Exception as e:
+        logger.error("diagram_node: Error during diagram generation - %s", e)
+        return {"architecture_diagram": ""}
 
-{diff_context}
 
-Generate ONLY valid Mermaid classDiagram code. No explanations, no comments inside the diagram."""
+async def _sample_diagram(model_name: str, temperature: float, messages: list):
+    """
+    Requests one diagram sample at the given temperature.
 
-        messages = [
-            {"role": "system", "content": DIAGRAM_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ]
+    Args:
+        model_name: The Groq model identifier.
+        temperature: Sampling temperature for this sample.
+        messages: The chat messages from `_build_messages`.
 
-        response = llm.invoke(messages)
-        raw_diagram = response.content
+    Returns:
+        str: The raw diagram text returned by the LLM.
+    """
+    # Temperature-0 samples share cache entries with the sync node
+    cache_name = model_name if temperature == 0 else f"{model_name}@{temperature}"
+    response = await cached_ainvoke(
+        get_llm(model_name, temperature), messages, model_name=cache_name
+    )
+    return response.content
 
-        # Sanitize and validate
-        cleaned_diagram = sanitize_diagram(raw_diagram)
 
-        if cleaned_diagram:
-            logger.info("diagram_node: Diagram generated and validated successfully")
-            # Wrap in markdown code block for GitHub rendering
-            final_diagram = f"```mermaid\n{cleaned_diagram}\n```"
-            return {"architecture_diagram": final_diagram}
-        else:
-            logger.warning("diagram_node: Generated diagram failed validation")
+async def _first_valid_diagram(
+    model_name: str, temperatures: tuple, messages: list
+) -> dict | None:
+    """
+    Requests samples at `temperatures` in parallel and keeps the first valid one.
+
+    The remaining samples are cancelled as soon as one passes validation.
+
+    Args:
+        model_name: The Groq model identifier.
+        temperatures: Sampling temperatures, one request each.
+        messages: The chat messages from `_build_messages`.
+
+    Returns:
+        dict | None: The state update for the first valid diagram, or None
+        if every sample failed.
+    """
+    tasks = [
+        asyncio.ensure_future(_sample_diagram(model_name, t, messages))
+        for t in temperatures
+    ]
+    try:
+        for next_sample in asyncio.as_completed(tasks):
+            try:
+                raw_diagram = await next_sample
+            except Exception as e:
+                logger.warning("diagram_node: Sample failed - %s", e)
+                continue
+
+            update = _to_state_update(raw_diagram)
+            if update["architecture_diagram"]:
+                return update
+    finally:
+        for task in tasks:
+            task.cancel()
+        # Retrieve every outcome (including failures and cancellations)
+        # so no task is garbage-collected with an unretrieved exception
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    return None
+
+
+async def adiagram_node(state: AgentState) -> dict:
+    """
+    Async variant of diagram_node used when the graph runs via `ainvoke`.
+
+    Awaits the LLM instead of blocking a worker thread, so the diagram
+    request overlaps with the logic and style agents on the event loop.
+    One sample at the first of _SAMPLE_TEMPERATURES is requested; only if
+    it fails validation are the other temperatures requested in parallel,
+    and the first of those that passes is used.
+
+    Args:
+        state: The shared AgentState containing pr_diff to analyze.
+
+    Returns:
+        A dict with 'architecture_diagram' key containing the Mermaid code
+        (or empty string if every sample fails).
+
+    Example:
+        >>> result = await adiagram_node({"pr_diff": "diff --git ..."})
+        >>> result["architecture_diagram"].startswith("```mermaid")
+        True
+    """
+    try:
+        pr_diff = state.get("pr_diff", "")
+        if not pr_diff:
+            logger.warning("diagram_node: No PR diff provided")
             return {"architecture_diagram": ""}
 
+        # Skip the LLM entirely when no class/function was added
+        model_name = _select_model(pr_diff)
+        if model_name is None:
+            logger.info("diagram_node: No structural changes, skipping diagram")
+            return {"architecture_diagram": ""}
+
+        messages = _build_messages(pr_diff)
+        first, *retries = _SAMPLE_TEMPERATURES
+        update = await _first_valid_diagram(model_name, (first,), messages)
+        if update is None and retries:
+            logger.info("diagram_node: Invalid diagram, sampling %d more", len(retries))
+            update = await _first_valid_diagram(model_name, tuple(retries), messages)
+
+        return update or {"architecture_diagram": ""}
+
     except Exception as e:
-        logger.error(f"diagram_node: Error during diagram generation - {e}")
+        logger.error("diagram_node: Error during diagram generation - %s", e)
         return {"architecture_diagram": ""}
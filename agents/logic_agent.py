@@ -7,15 +7,19 @@ It focuses on logical errors, security vulnerabilities, and critical bugs.
 """
 
 import os
-import logging
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+import utils.env  # noqa: F401  (loads .env once per process)
 from core.state import AgentState
-from utils.common import LOGIC_PROMPT
+from agents.review import prepare_review, review_update, review_error
+from utils.llm_cache import cached_invoke, cached_ainvoke
 
-load_dotenv()
+# Heavy model (Llama 3.3 70B) for deep analysis
+_MODEL = os.getenv("MODEL_HEAVY", "llama-3.3-70b-versatile")
 
-logger = logging.getLogger(__name__)
+# Static part of the user prompt, identical for every logic review request
+_LOGIC_INSTRUCTIONS = (
+    "Analyze the following code for logic, security, and bug issues.\n"
+    "Apply the logic review guidelines and provide findings in JSON format."
+)
 
 
 def logic_node(state: AgentState) -> dict:
@@ -26,7 +30,7 @@ def logic_node(state: AgentState) -> dict:
 
     Returns:
             A dict with 'logic_comments' key containing a list of formatted
-            logic/security/bug findings, ready to append to the shared state via operator.add.
+            logic/security/bug findings, ready to append to the shared state via its reducer.
 
     Example:
             >>> state = {"pr_diff": "diff...", "logic_comments": [], ...}
@@ -35,33 +39,36 @@ def logic_node(state: AgentState) -> dict:
             ["**Generated by Multi-Agent PR Review System - Logic Agent**\n...", ...]
     """
     try:
-        pr_diff = state.get("pr_diff", "")
-        if not pr_diff:
-            logger.warning("logic_node: No PR diff provided")
-            return {"logic_comments": []}
-
-        # Use the heavy model (Llama 3.3 70B)
-        model_name = os.getenv("MODEL_HEAVY", "llama-3.3-70b-versatile")
-        llm = ChatGroq(temperature=0, model_name=model_name)
-
-        user_prompt = f"""Analyze the following code for logic, security, and bug issues:
+        request = prepare_review(state, "logic", _MODEL, _LOGIC_INSTRUCTIONS)
+        if request is None:
+            return review_update("logic")
+        return review_update("logic", cached_invoke(*request))
+    except Exception as e:
+        return review_error("logic", e)
 
-        {pr_diff}
 
-        Apply the logic review guidelines and provide findings in JSON format."""
+async def alogic_node(state: AgentState) -> dict:
+    """Async variant of logic_node used when the graph runs via `ainvoke`.
 
-        messages = [
-            {"role": "system", "content": LOGIC_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ]
+    Awaits the LLM so the logic, style, and diagram requests are in flight
+    on Groq at the same time instead of each holding a worker thread.
 
-        response = llm.invoke(messages)
-        response_text = response.content
+    Args:
+            state: The shared AgentState containing pr_diff to analyze.
 
-        logger.info("logic_node: Analysis completed successfully")
-        return {"logic_comments": [response_text]}
+    Returns:
+            A dict with 'logic_comments' key containing a list of formatted
+            logic/security/bug findings.
 
+    Example:
+            >>> result = await alogic_node({"pr_diff": "diff..."})
+            >>> len(result["logic_comments"])
+            1
+    """
+    try:
+        request = prepare_review(state, "logic", _MODEL, _LOGIC_INSTRUCTIONS)
+        if request is None:
+            return review_update("logic")
+        return review_update("logic", await cached_ainvoke(*request))
     except Exception as e:
-        logger.error(f"logic_node: Error during analysis - {e}")
-        error_comment = f"**Logic Agent Error**: {str(e)}"
-        return {"logic_comments": [error_comment]}
+        return review_error("logic", e)
@@ -0,0 +1,88 @@
+"""Shared node plumbing for the logic and style review agents.
+
+Both agents send the PR diff to one model and return its answer as a single
+comment. The steps around the LLM call (diff validation, client lookup,
+state update, error handling) live here so each sync/async node pair only
+differs in how it invokes the model.
+"""
+
+import logging
+from core.state import AgentState
+from utils.llm import get_llm
+from utils.prompt import build_messages
+
+logger = logging.getLogger(__name__)
+
+
+def prepare_review(
+    state: AgentState, agent: str, model_name: str, instructions: str
+) -> tuple | None:
+    """
+    Validates the state and builds the LLM request for a review agent.
+
+    Args:
+        state: The shared AgentState containing pr_diff to analyze.
+        agent: The agent name ("logic" or "style"), which also selects its
+            system prompt.
+        model_name: The Groq model the review is sent to.
+        instructions: The agent's static review instructions.
+
+    Returns:
+        tuple | None: (llm, messages, model_name) ready for `cached_invoke`
+        / `cached_ainvoke`, or None when there is no diff to review.
+
+    Example:
+        >>> prepare_review({"pr_diff": ""}, "logic", "llama", "Review.") is None
+        True
+    """
+    pr_diff = state.get("pr_diff", "")
+    if not pr_diff:
+        logger.warning("%s_node: No PR diff provided", agent)
+        return None
+    return (
+        get_llm(model_name),
+        build_messages(agent, instructions, pr_diff),
+        model_name,
+    )
+
+
+def review_update(agent: str, response=None) -> dict:
+    """
+    Turns an LLM response into the agent's state update.
+
+    Args:
+        agent: The agent name ("logic" or "style").
+        response: The LLM message, or None when the review was skipped.
+
+    Returns:
+        dict: '<agent>_comments' with the response text (empty if skipped),
+        ready to append to the shared state via its reducer.
+
+    Example:
+        >>> review_update("style")
+        {'style_comments': []}
+    """
+    if response is None:
+        return {f"{agent}_comments": []}
+
+    logger.info("%s_node: Analysis completed successfully", agent)
+    return {f"{agent}_comments": [response.content]}
+
+
+def review_error(agent: str, error: Exception) -> dict:
+    """
+    Logs a failed review and reports it as the agent's comment.
+
+    Args:
+        agent: The agent name ("logic" or "style").
+        error: The exception raised while reviewing.
+
+    Returns:
+        dict: '<agent>_comments' holding a single error comment.
+
+    Example:
+        >>> review_error("logic", ValueError("boom"))
+        {'logic_comments': ['**Logic Agent Error**: boom']}
+    """
+    logger.error("%s_node: Error during analysis - %s", agent, error)
+    return {f"{agent}_comments": [f"**{agent.title()} Agent Error**: {error}"]}
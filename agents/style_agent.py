@@ -7,16 +7,19 @@ Uses Llama 3.1 8B for quick execution.
 """
 
 import os
-import json
-import logging
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+import utils.env  # noqa: F401  (loads .env once per process)
 from core.state import AgentState
-from utils.common import STYLE_PROMPT
+from agents.review import prepare_review, review_update, review_error
+from utils.llm_cache import cached_invoke, cached_ainvoke
 
-load_dotenv()
+# Fast model (Llama 3.1 8B) for quick style checks
+_MODEL = os.getenv("MODEL_FAST", "llama-3.1-8b-instant")
 
-logger = logging.getLogger(__name__)
+# Static part of the user prompt, identical for every style review request
+_STYLE_INSTRUCTIONS = (
+    "Analyze the following code for style and formatting issues.\n"
+    "Apply the style review guidelines and provide findings in JSON format."
+)
 
 
 def style_node(state: AgentState) -> dict:
@@ -34,7 +37,7 @@ def style_node(state: AgentState) -> dict:
 
     Returns:
         A dict with 'style_comments' key containing a list of formatted
-        style issue strings, ready to append to the shared state via operator.add.
+        style issue strings, ready to append to the shared state via its reducer.
 
     Example:
         >>> state = {"pr_diff": "code snippet...", "logic_comments": [], ...}
@@ -43,35 +46,36 @@ def style_node(state: AgentState) -> dict:
         ["**Generated by Multi-Agent PR Review System - Style Agent**\n...", "..."]
     """
     try:
-        pr_diff = state.get("pr_diff", "")
-        if not pr_diff:
-            logger.warning("style_node: No PR diff provided")
-            return {"style_comments": []}
-
-        # Initialize the fast model (8B)
-        model_name = os.getenv("MODEL_FAST", "llama-3.1-8b-instant")
-        llm = ChatGroq(temperature=0, model_name=model_name)
-
-        # Prepare the analysis prompt
-        user_prompt = f"""Analyze the following code for style and formatting issues:
+        request = prepare_review(state, "style", _MODEL, _STYLE_INSTRUCTIONS)
+        if request is None:
+            return review_update("style")
+        return review_update("style", cached_invoke(*request))
+    except Exception as e:
+        return review_error("style", e)
 
-{pr_diff}
 
-Apply the style review guidelines and provide findings in JSON format."""
+async def astyle_node(state: AgentState) -> dict:
+    """Async variant of style_node used when the graph runs via `ainvoke`.
 
-        # Invoke the model with the system prompt and user input
-        messages = [
-            {"role": "system", "content": STYLE_PROMPT},
-            {"role": "user", "content": user_prompt},
-        ]
+    Awaits the LLM so the logic, style, and diagram requests are in flight
+    on Groq at the same time instead of each holding a worker thread.
 
-        response = llm.invoke(messages)
-        response_text = response.content
+    Args:
+        state: The shared AgentState containing pr_diff to analyze.
 
-        logger.info("style_node: Analysis completed successfully")
-        return {"style_comments": [response_text]}
+    Returns:
+        A dict with 'style_comments' key containing a list of formatted
+        style issue strings.
 
+    Example:
+        >>> result = await astyle_node({"pr_diff": "code snippet..."})
+        >>> len(result["style_comments"])
+        1
+    """
+    try:
+        request = prepare_review(state, "style", _MODEL, _STYLE_INSTRUCTIONS)
+        if request is None:
+            return review_update("style")
+        return review_update("style", await cached_ainvoke(*request))
     except Exception as e:
-        logger.error(f"style_node: Error during analysis - {e}")
-        error_comment = f"**Style Agent Error**: {str(e)}"
-        return {"style_comments": [error_comment]}
+        return review_error("style", e)
@@ -18,30 +18,153 @@ Behavior guarantees:
 
 from __future__ import annotations
 
+import functools
 import logging
 import os
-import re
-from utils import ORCHESTRATOR_PROMPT
+from concurrent.futures import ThreadPoolExecutor
 from langchain_core.messages import AIMessage
-from dotenv import load_dotenv
-from langchain_groq import ChatGroq
+import utils.env  # noqa: F401  (loads .env once per process)
 from core.state import AgentState
-
-load_dotenv()
+from utils.llm import get_llm
+from utils.llm_cache import cached_invoke
+from utils.mermaid import is_valid_mermaid_diagram
+from utils.prompt import build_messages, truncate_for_context
 
 logger = logging.getLogger(__name__)
 
-# Reuse the diagram validation from the diagram agent to avoid duplication
-from agents.diagram_agent import is_valid_mermaid_diagram
-
-# Backwards-compatible alias (tests and callers may import `is_valid_mermaid`)
+# Backwards-compatible alias for the shared, memoized validator (also used by
+# the diagram agent); tests and callers may import `is_valid_mermaid`
 is_valid_mermaid = is_valid_mermaid_diagram
 
+# Maximum diff size (in characters) accepted for automated review
+_MAX_CHARS = int(os.getenv("PR_MAX_CHARS", "60000"))
+
+# Read once at import; the model doesn't change within a process
+_MODEL_HEAVY = os.getenv("MODEL_HEAVY", "llama-3.3-70b-versatile")
+
+# Cap on each agent's findings in the prompt, so one runaway agent response
+# can't push the report request past the model's context window. Agents
+# return their whole JSON review as one item, so a single item may use all
+# of it.
+_MAX_SECTION_CHARS = 8000
+# Appended wherever findings were cut, so the report LLM knows text is missing
+_TRUNCATED_MARKER = "…[truncated]"
+
+# Static head of the report prompt, shared by every supervisor call
+_REPORT_INSTRUCTIONS = (
+    "INSTRUCTIONS:\n"
+    "1. Group into '🚨 Security & Logic' and '🎨 Style'.\n"
+    "2. Deduplicate findings intelligently.\n"
+    "3. If a section is empty, mark it 'No issues found'.\n"
+    "4. Be concise and professional.\n"
+    "5. Output Markdown only (no code blocks unless showing examples)."
+)
+
+
+def _cached_prompt_tokens(response) -> int | None:
+    """
+    Extracts the number of prompt tokens Groq served from its prompt cache.
+
+    Args:
+        response: The message returned by `llm.invoke`.
+
+    Returns:
+        int | None: Cached prompt token count, or None if not reported.
+
+    Example:
+        >>> _cached_prompt_tokens(llm.invoke(messages))
+        512
+    """
+    metadata = getattr(response, "response_metadata", None)
+    if not isinstance(metadata, dict):
+        return None
+
+    usage = metadata.get("token_usage") or metadata.get("usage") or {}
+    details = usage.get("prompt_tokens_details") or {}
+    return details.get("cached_tokens", usage.get("cached_tokens"))
+
+
+def _format_findings(items: list) -> str:
+    """
+    Renders agent findings as a Markdown bullet list for the report prompt.
+
+    Strings are used as-is; dict findings contribute their 'description'.
+    The section is cut at _MAX_SECTION_CHARS, with _TRUNCATED_MARKER
+    appended when anything was dropped.
+
+    Args:
+        items: Findings from an agent (strings or dicts).
+
+    Returns:
+        str: One "- finding" line per item.
+
+    Example:
+        >>> _format_findings(["SQL injection", {"description": "Race"}])
+        '- SQL injection\\n- Race'
+    """
+    lines = []
+    for item in items:
+        if type(item) is not str:
+            item = (
+                item.get("description", str(item))
+                if isinstance(item, dict)
+                else str(item)
+            )
+        lines.append("- " + item)
+
+    # A list (not a generator) lets str.join size the result in one pass
+    section = "\n".join(lines)
+    if len(section) <= _MAX_SECTION_CHARS:
+        return section
+    return section[:_MAX_SECTION_CHARS] + _TRUNCATED_MARKER
+
+
+@functools.lru_cache(maxsize=8)
+def _compress_diff(diff: str, max_chars: int) -> str:
+    """
+    Reduces a diff to what the report needs: file and hunk headers plus
+    changed lines, capped at `max_chars`.
+
+    Unchanged context lines and the ---/+++ file markers before each file's
+    first hunk are dropped; the logic and style agents have already seen
+    the full diff.
+
+    Args:
+        diff: The (already compressed) PR diff.
+        max_chars: Upper bound on the returned text length.
+
+    Returns:
+        str: The reduced diff, head+tail truncated if still over the cap.
+
+    Example:
+        >>> _compress_diff("@@ -1 +1 @@\\n ctx\\n-old\\n+new", 100)
+        '@@ -1 +1 @@\\n-old\\n+new'
+    """
+    kept = []
+    in_file_header = True  # Between "diff --git" and the file's first "@@"
+    for line in diff.split("\n"):
+        if line.startswith("diff --git"):
+            in_file_header = True
+        elif line.startswith("@@"):
+            in_file_header = False
+        elif in_file_header and line.startswith(("+++ ", "--- ")):
+            # File markers only; in a hunk "--- x" is a removed "-- x" line
+            continue
+
+        if line.startswith(("diff --git", "@@", "+", "-", "...")):
+            kept.append(line)
+
+    return truncate_for_context("\n".join(kept), max_chars)
+
 
 def format_diagram_section(diagram: str) -> str:
     """
     Formats the architecture diagram as a GitHub-friendly section.
 
+    A diagram already wrapped in a ```mermaid fence comes from diagram_node,
+    which only fences output that passed sanitization and validation, so it
+    is trusted as-is. Anything else is validated before being wrapped.
+
     Args:
         diagram: The raw Mermaid diagram (may or may not be in code block).
 
@@ -49,15 +172,19 @@ def format_diagram_section(diagram: str) -> str:
         str: Formatted diagram section ready for insertion into report,
              or empty string if diagram is invalid.
     """
-    if not diagram or not is_valid_mermaid(diagram):
-        logger.warning(
-            "supervisor_node: Diagram validation failed, omitting from report"
-        )
+    if not diagram:
         return ""
 
-    # Ensure diagram is wrapped in markdown code block
-    if not diagram.startswith("```"):
-        diagram = f"```mermaid\n{diagram}\n```"
+    if not diagram.startswith("```mermaid"):
+        if not is_valid_mermaid(diagram):
+            logger.warning(
+                "supervisor_node: Diagram validation failed, omitting from report"
+            )
+            return ""
+
+        # Ensure diagram is wrapped in markdown code block
+        if not diagram.startswith("```"):
+            diagram = f"```mermaid\n{diagram}\n```"
 
     section = (
         "## 📊 Architecture Visualization\n\n"
@@ -90,47 +217,48 @@ def supervisor_node(state: AgentState) -> dict:
         - Professional Markdown formatting
     """
     try:
-        # 1. Extract inputs from all agents
-        logic_data = state.get("logic_comments", []) or []
-        style_data = state.get("style_comments", []) or []
-        architecture_diagram = state.get("architecture_diagram", "") or ""
-        pr_diff = state.get("pr_diff", "") or ""
-        pr_url = state.get("pr_url")
-
-        if not pr_url:
-            logger.warning("supervisor_node: pr_url not found in state.")
-            return {
-                "final_report": "## ⚠️ PR Review Aborted\n\n**Reason:** PR URL not provided."
-            }
-
-        # 2. SAFETY CHECK: Diff Size Limit
-        max_chars = int(os.getenv("PR_MAX_CHARS", "60000"))
+        # 1. SAFETY CHECK: Diff Size Limit (before touching anything else)
+        pr_diff = state.get("pr_diff") or ""
         curr_len = len(pr_diff)
 
-        if curr_len > max_chars:
+        if curr_len > _MAX_CHARS:
             logger.warning(
-                f"supervisor_node: PR size ({curr_len}) exceeds limit "
-                f"({max_chars}). Aborting."
+                "supervisor_node: PR size (%d) exceeds limit (%d). Aborting.",
+                curr_len,
+                _MAX_CHARS,
             )
             error_msg = (
                 "## ⚠️ PR Review Aborted\n\n"
                 "**Reason:** The Pull Request is too large for automated "
                 f"analysis.\n\n"
                 f"- **Size Detected:** {curr_len} characters\n"
-                f"- **Limit:** {max_chars} characters\n\n"
+                f"- **Limit:** {_MAX_CHARS} characters\n\n"
                 "Please reduce the PR scope or review critical files manually."
             )
             return {"final_report": error_msg}
 
-        # 3. Validate and format architecture diagram
-        diagram_section = format_diagram_section(architecture_diagram)
+        # 2. Extract inputs from all agents
+        logic_data = state.get("logic_comments", []) or []
+        style_data = state.get("style_comments", []) or []
+        architecture_diagram = state.get("architecture_diagram", "") or ""
+        pr_url = state.get("pr_url")
+
+        if not pr_url:
+            logger.warning("supervisor_node: pr_url not found in state.")
+            return {
+                "final_report": "## ⚠️ PR Review Aborted\n\n**Reason:** PR URL not provided."
+            }
 
-        # 4. Quick exit if no findings and no diagram
-        if not logic_data and not style_data and not diagram_section:
+        # 3. Quick exit if no findings: the report is static (plus the
+        # diagram, if any), so no LLM call is needed
+        if not logic_data and not style_data:
             logger.info("supervisor_node: No findings to report.")
-            final_report = (
-                "## ✅ Automated PR Review\n\n"
-                "No critical issues or style suggestions detected."
+            final_report = "".join(
+                (
+                    format_diagram_section(architecture_diagram),
+                    "## ✅ Automated PR Review\n\n"
+                    "No critical issues or style suggestions detected.",
+                )
             )
             tool_call = {
                 "name": "post_comment",
@@ -145,47 +273,55 @@ def supervisor_node(state: AgentState) -> dict:
 
             return {"final_report": final_report, "messages": [message]}
 
-        # 5. Prepare findings context for LLM
-        logic_text = "\n".join(f"- {str(item)}" for item in logic_data)
-        style_text = "\n".join(f"- {str(item)}" for item in style_data)
-
-        # Truncate diff for prompt context
-        diff_context = (
-            pr_diff[:10000] + "...(truncated for context)"
-            if len(pr_diff) > 10000
-            else pr_diff
-        )
-
-        user_msg = (
-            f"PR CONTEXT:\n{diff_context}\n\n"
-            f"LOGIC FINDINGS:\n{logic_text}\n\n"
-            f"STYLE FINDINGS:\n{style_text}\n\n"
-            "INSTRUCTIONS:\n"
-            "1. Group into '🚨 Security & Logic' and '🎨 Style'.\n"
-            "2. Deduplicate findings intelligently.\n"
-            "3. If a section is empty, mark it 'No issues found'.\n"
-            "4. Be concise and professional.\n"
-            "5. Output Markdown only (no code blocks unless showing examples)."
+        # 4. Prepare findings context for LLM
+        logic_text = _format_findings(logic_data)
+        style_text = _format_findings(style_data)
+
+        # Changed lines only, truncated for prompt context
+        diff_context = _compress_diff(pr_diff, 10000)
+
+        # Per-PR part of the prompt, joined once (no intermediate copies of
+        # the multi-KB diff/findings blocks)
+        report_context = "".join(
+            (
+                "PR CONTEXT:\n",
+                diff_context,
+                "\n\nLOGIC FINDINGS:\n",
+                logic_text,
+                "\n\nSTYLE FINDINGS:\n",
+                style_text,
+            )
         )
 
-        # 6. Generate final report content from LLM
-        model_name = os.getenv("MODEL_HEAVY", "llama-3.3-70b-versatile")
-        llm = ChatGroq(temperature=0, model_name=model_name)
+        # 5. Generate final report content from LLM. The diagram is
+        # validated and formatted on a worker thread while this thread
+        # blocks on the network, and joined only at report assembly.
+        llm = get_llm(_MODEL_HEAVY)
 
-        response = llm.invoke(
-            [
-                {"role": "system", "content": ORCHESTRATOR_PROMPT},
-                {"role": "user", "content": user_msg},
-            ]
-        )
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            diagram_future = executor.submit(
+                format_diagram_section, architecture_diagram
+            )
+            response = cached_invoke(
+                llm,
+                build_messages(
+                    "orchestrator", _REPORT_INSTRUCTIONS, report_context
+                ),
+                _MODEL_HEAVY,
+            )
+            diagram_section = diagram_future.result()
 
         logger.info("supervisor_node: Final report content generated successfully.")
+        logger.info(
+            "supervisor_node: Cached prompt tokens: %s",
+            _cached_prompt_tokens(response),
+        )
         findings_report = response.content
 
-        # 7. ASSEMBLE FINAL REPORT: Diagram first, then findings
-        final_report = diagram_section + findings_report
+        # 6. ASSEMBLE FINAL REPORT: Diagram first, then findings
+        final_report = "".join((diagram_section, findings_report))
 
-        # 8. Prepare tool call for GitHub posting
+        # 7. Prepare tool call for GitHub posting
         tool_call = {
             "name": "post_comment",
             "args": {"pr_url": pr_url, "comment_body": final_report},
@@ -202,5 +338,5 @@ def supervisor_node(state: AgentState) -> dict:
         return {"final_report": final_report, "messages": [message]}
 
     except Exception as e:
-        logger.error(f"supervisor_node: Critical error - {e}")
+        logger.error("supervisor_node: Critical error - %s", e)
         return {"final_report": f"## ⚠️ System Error\nFailed to generate report: {e}"}
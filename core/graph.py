@@ -1,15 +1,18 @@
 # LangGraph definicija: Nodes (čvorovi) i Edges (veze)
 
-from langgraph.graph import StateGraph, END
+import functools
+from langchain_core.runnables import RunnableLambda
+from langgraph.graph import StateGraph, START, END
 from langgraph.prebuilt import ToolNode, tools_condition
 from core.state import AgentState
-from agents.logic_agent import logic_node
-from agents.style_agent import style_node
-from agents.diagram_agent import diagram_node
+from agents.logic_agent import logic_node, alogic_node
+from agents.style_agent import style_node, astyle_node
+from agents.diagram_agent import diagram_node, adiagram_node
 from agents.supervisor import supervisor_node
 from utils import post_comment
 
 
+@functools.lru_cache(maxsize=1)
 def build_graph():
     """
     Creates and compiles the LangGraph workflow for the multi-agent PR review system.
@@ -17,6 +20,10 @@ def build_graph():
     Adds logic, style, and supervisor nodes, sets parallel entry,
     connects to supervisor and END, and returns the compiled app.
 
+    The compiled app is built once and shared by every caller: it holds no
+    per-run state (each invoke gets its own AgentState), so reusing it across
+    reviews is safe.
+
     To draw the graph you can use: `app.get_graph().draw_ascii()`
 
     Returns:
@@ -31,16 +38,17 @@ def build_graph():
     graph = StateGraph(AgentState)
 
     # Add nodes (all agents run in parallel)
-    graph.add_node("logic", logic_node)
-    graph.add_node("style", style_node)
-    graph.add_node("diagram", diagram_node)
+    # Sync path for app.invoke, awaited LLM calls for app.ainvoke
+    graph.add_node("logic", RunnableLambda(logic_node, afunc=alogic_node))
+    graph.add_node("style", RunnableLambda(style_node, afunc=astyle_node))
+    graph.add_node("diagram", RunnableLambda(diagram_node, afunc=adiagram_node))
     graph.add_node("supervisor", supervisor_node)
     graph.add_node("tools", ToolNode([post_comment]))
 
     # Entry points: All three agents start in parallel
-    graph.add_edge("__start__", "logic")
-    graph.add_edge("__start__", "style")
-    graph.add_edge("__start__", "diagram")
+    graph.add_edge(START, "logic")
+    graph.add_edge(START, "style")
+    graph.add_edge(START, "diagram")
 
     # All agents converge to supervisor
     graph.add_edge("logic", "supervisor")
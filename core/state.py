@@ -9,19 +9,49 @@ import operator
 from langchain_core.messages import BaseMessage
 
 
+def _dedup_extend(existing: list, new: list) -> list:
+    """Reducer that appends `new` to `existing`, skipping repeated findings.
+
+    String findings already present (from this or an earlier node) are
+    dropped at merge time using a hash set; non-string items are always
+    appended since they may not be hashable.
+
+    Args:
+        existing: The list currently held in the state.
+        new: The list returned by a node.
+
+    Returns:
+        A new list with the unseen items of `new` appended.
+
+    Example:
+        >>> _dedup_extend(["Bug: SQL injection"], ["Bug: SQL injection", "Typo"])
+        ['Bug: SQL injection', 'Typo']
+    """
+    seen = {item for item in existing if isinstance(item, str)}
+    merged = list(existing)
+    for item in new:
+        if isinstance(item, str):
+            if item in seen:
+                continue
+            seen.add(item)
+        merged.append(item)
+    return merged
+
+
 class AgentState(TypedDict):
     """Shared state passed between agents in the PR review workflow.
 
     This TypedDict defines the data structure that all agents read from
-    and write to. The `operator.add` annotation ensures that list fields
-    accumulate comments from multiple agents rather than overwriting them.
+    and write to. The comment lists use the `_dedup_extend` reducer, so they
+    accumulate comments from multiple agents rather than overwriting them,
+    and identical comments are stored once.
 
     Fields:
         pr_diff: The pull-request diff or code under review.
         logic_comments: Accumulated logic/security/bug comments from agents.
-            Uses operator.add to append rather than replace.
+            Uses _dedup_extend to append (minus duplicates) rather than replace.
         style_comments: Accumulated style/formatting comments from agents.
-            Uses operator.add to append rather than replace.
+            Uses _dedup_extend to append (minus duplicates) rather than replace.
         architecture_diagram: Mermaid JS class diagram visualizing architectural changes.
             Generated by the Diagram Agent.
         final_report: Aggregated final report produced by the orchestrator.
@@ -47,8 +77,8 @@ class AgentState(TypedDict):
     """
 
     pr_diff: str
-    logic_comments: Annotated[List[str], operator.add]
-    style_comments: Annotated[List[str], operator.add]
+    logic_comments: Annotated[List[str], _dedup_extend]
+    style_comments: Annotated[List[str], _dedup_extend]
     architecture_diagram: str
     final_report: str
     pr_url: str
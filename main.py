@@ -1,17 +1,20 @@
 import os
 import sys
-from dotenv import load_dotenv
-from core.graph import build_graph
-from core.state import make_initial_state
-from utils.github_client import get_pr_diff
+import asyncio
 
 # Učitaj .env (samo za lokalno testiranje, na GitHubu ovo ne radi ništa jer nema .env fajla)
-load_dotenv()
+import utils.env  # noqa: F401
+from core.graph import build_graph
+from core.state import make_initial_state
+from utils.github_client import get_pr_diff_async
 
 
-def main():
+async def main():
     """
     Entry point for GitHub Action.
+
+    Runs the graph with `ainvoke`, so the logic, style and diagram agents
+    await their Groq requests concurrently on one event loop.
     """
     pr_url = os.getenv("PR_URL")
 
@@ -25,7 +28,7 @@ def main():
     try:
         # 3. Dohvati Diff
         try:
-            diff_data = get_pr_diff(pr_url)
+            diff_data = await get_pr_diff_async(pr_url)
         except Exception as e:
             print(f"Error fetching PR diff: {e}")
             sys.exit(1)
@@ -39,7 +42,8 @@ def main():
         state = make_initial_state(pr_diff, pr_url)
         app = build_graph()
 
-        result = app.invoke(state)
+        # Logic, style and diagram agents fan out from START in parallel
+        result = await app.ainvoke(state, config={"max_concurrency": 3})
 
         # Logika za ispis rezultata (ToolNode će već objaviti komentar na GitHub)
         if "final_report" in result:
@@ -53,4 +57,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
+    asyncio.run(main())
@@ -6,6 +6,8 @@ from unittest.mock import patch, MagicMock
 from core.state import make_initial_state
 from agents.diagram_agent import diagram_node
 from agents.supervisor import supervisor_node
+from utils import llm_cache
+from utils.llm import get_llm
 
 # Mock LLM responses
 MOCK_DIAGRAM = """```mermaid
@@ -110,9 +112,17 @@ mock_llm_response.content = """### 🚨 Security & Logic
 Overall, the PR introduces solid new model classes with proper inheritance patterns. The SQL injection risk should be addressed before merging.
 """
 
-with patch("agents.supervisor.ChatGroq") as mock_groq:
-    mock_groq.return_value.invoke.return_value = mock_llm_response
-    result = supervisor_node(state)
+# get_llm memoizes clients: clear it so the patched ChatGroq is used, and
+# again afterwards (with the memoized responses) so the mock doesn't leak
+# into later tests
+get_llm.cache_clear()
+try:
+    with patch("langchain_groq.ChatGroq") as mock_groq:
+        mock_groq.return_value.invoke.return_value = mock_llm_response
+        result = supervisor_node(state)
+finally:
+    get_llm.cache_clear()
+    llm_cache._memory.clear()
 
 final_report = result["final_report"]
 
@@ -131,16 +141,13 @@ print()
 print(" VALIDATION CHECKS:")
 print()
 
+# Locate each section once (-1 if missing) instead of re-scanning per check
+i_arch = final_report.find(" Architecture Visualization")
+i_sec = final_report.find("Security & Logic")
+
 checks = [
-    (
-        "Contains Architecture Visualization header",
-        " Architecture Visualization" in final_report,
-    ),
-    (
-        "Diagram placed at TOP (before findings)",
-        final_report.index(" Architecture Visualization")
-        < final_report.index("Security & Logic"),
-    ),
+    ("Contains Architecture Visualization header", i_arch >= 0),
+    ("Diagram placed at TOP (before findings)", 0 <= i_arch < i_sec),
     ("Contains Mermaid code block", "```mermaid" in final_report),
     ("Contains Security findings", " Security & Logic" in final_report),
     ("Contains Style findings", "Style" in final_report),
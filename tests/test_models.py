@@ -1,5 +1,6 @@
 import os
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dotenv import load_dotenv
 from langchain_groq import ChatGroq
 
@@ -9,19 +10,23 @@ api_key = os.getenv("GROQ_API_KEY")
 
 
 def test_model(name, model_id, prompt):
-    print(f"\nTestiram: {name} ({model_id})...")
+    # Returns the result instead of printing, so parallel calls do not
+    # interleave their output
     try:
         llm = ChatGroq(temperature=0, model_name=model_id, api_key=api_key)
         start = time.time()
         response = llm.invoke(prompt)
         duration = time.time() - start
 
-        print(f"USPJEH ({duration:.2f}s)")
-        print(f"Odgovor: {response.content}")
-        return True
+        return {
+            "name": name,
+            "model_id": model_id,
+            "ok": True,
+            "duration": duration,
+            "content": response.content,
+        }
     except Exception as e:
-        print(f"GRESKA na {name}: {e}")
-        return False
+        return {"name": name, "model_id": model_id, "ok": False, "error": e}
 
 
 # --- GLAVNI DIO ---
@@ -30,14 +35,28 @@ if __name__ == "__main__":
         print("Nema API kljuca!")
         exit(1)
 
-    test_model(
-        "MOZAK (Llama 3.3 70B)",
-        "llama-3.3-70b-versatile",
-        "Napisi jednu kratku recenicu o kvantnoj fizici.",
-    )
-
-    test_model(
-        "BRZINAC (Llama 3.1 8B)",
-        "llama-3.1-8b-instant",
-        "Napisi samo jednu rijec: Pozdrav.",
-    )
+    cases = [
+        (
+            "MOZAK (Llama 3.3 70B)",
+            "llama-3.3-70b-versatile",
+            "Napisi jednu kratku recenicu o kvantnoj fizici.",
+        ),
+        (
+            "BRZINAC (Llama 3.1 8B)",
+            "llama-3.1-8b-instant",
+            "Napisi samo jednu rijec: Pozdrav.",
+        ),
+    ]
+
+    # Both models are tested in parallel (pure I/O against Groq)
+    with ThreadPoolExecutor(max_workers=len(cases)) as ex:
+        futures = [ex.submit(test_model, *args) for args in cases]
+        results = [f.result() for f in futures]
+
+    for result in results:
+        print(f"\nTestiram: {result['name']} ({result['model_id']})...")
+        if result["ok"]:
+            print(f"USPJEH ({result['duration']:.2f}s)")
+            print(f"Odgovor: {result['content']}")
+        else:
+            print(f"GRESKA na {result['name']}: {result['error']}")
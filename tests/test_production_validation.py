@@ -13,6 +13,8 @@ from agents.diagram_agent import (
     sanitize_diagram,
 )
 from agents.supervisor import supervisor_node, is_valid_mermaid, format_diagram_section
+from utils import llm_cache
+from utils.llm import get_llm
 
 
 def test_imports():
@@ -113,6 +115,45 @@ def test_diagram_node_structure():
     return True
 
 
+def test_diagram_model_routing():
+    """Test diagram model selection based on structural edits."""
+    print("\nTEST: Diagram Model Routing")
+
+    import os
+    from agents.diagram_agent import _select_model
+
+    fast = os.getenv("MODEL_FAST", "llama-3.1-8b-instant")
+    heavy = os.getenv("MODEL_HEAVY", "llama-3.3-70b-versatile")
+    many_classes = "\n".join(f"+class Model{i}:" for i in range(6))
+
+    checks = [
+        (_select_model("+x = 1\n-y = 2") is None, "No structure skips LLM"),
+        (_select_model("+class User:\n+    def save(self):") == fast, "Few edits use fast model"),
+        (_select_model(many_classes) == heavy, "Many edits use heavy model"),
+    ]
+
+    # Definitions behind modifiers/decorators or in other languages
+    for line in (
+        "+async def fetch(self):",
+        "+export class Api {",
+        "+public class User {",
+        "+abstract class Base {",
+        "+type Config struct {",
+        "+pub struct Point {",
+        "+data class Item(val id: Int)",
+        "+@dataclass\n+class Point:",
+    ):
+        label = line.splitlines()[0][1:]
+        checks.append((_select_model(line) == fast, f"Detected: {label}"))
+
+    for check, desc in checks:
+        status = "✓" if check else "✗"
+        print(f"  {status} {desc}")
+        assert check, desc
+
+    return True
+
+
 def test_graph_compilation():
     """Test graph compiles without errors."""
     print("\nTEST: Graph Compilation")
@@ -170,23 +211,186 @@ def test_supervisor_with_diagram():
     mock_response = MagicMock()
     mock_response.content = "Test findings"
 
-    with patch("agents.supervisor.ChatGroq") as mock_groq:
-        mock_groq.return_value.invoke.return_value = mock_response
-        result = supervisor_node(state)
+    # get_llm memoizes clients: clear it so the patched ChatGroq is used, and
+    # again afterwards (with the memoized responses) so the mock doesn't leak
+    # into later tests
+    get_llm.cache_clear()
+    try:
+        with patch("langchain_groq.ChatGroq") as mock_groq:
+            mock_groq.return_value.invoke.return_value = mock_response
+            result = supervisor_node(state)
+    finally:
+        get_llm.cache_clear()
+        llm_cache._memory.clear()
 
     final_report = result.get("final_report", "")
 
-    if "Architecture Visualization" in final_report:
-        print("  ✓ Diagram section appears in final report")
-    else:
-        print("  ✗ Diagram section missing from final report")
-        return False
+    has_diagram = "Architecture Visualization" in final_report
+    print(f"  {'✓' if has_diagram else '✗'} Diagram section in final report")
+    assert has_diagram, "Diagram section missing from final report"
 
-    if final_report.find("📊") < final_report.find("Test findings"):
-        print("  ✓ Diagram positioned before findings")
-    else:
-        print("  ✗ Diagram not positioned at top")
-        return False
+    i_arch = final_report.find("📊")
+    i_find = final_report.find("Test findings")
+    on_top = 0 <= i_arch < i_find
+    print(f"  {'✓' if on_top else '✗'} Diagram positioned before findings")
+    assert on_top, "Diagram not positioned at top"
+
+    return True
+
+
+def test_comment_reducer_dedup():
+    """Test repeated comments are merged into the state only once."""
+    print("\nTEST: Comment Reducer Deduplication")
+
+    from core.state import _dedup_extend
+
+    merged = _dedup_extend(["SQL injection"], ["SQL injection", "Race", "Race"])
+
+    deduped = merged == ["SQL injection", "Race"]
+    print(f"  {'✓' if deduped else '✗'} Duplicate comments dropped at merge time")
+    assert deduped, f"Unexpected merge result: {merged}"
+
+    return True
+
+
+def test_truncate_for_context():
+    """Test diff truncation keeps both head and tail."""
+    print("\nTEST: Context Truncation")
+
+    from utils.prompt import truncate_for_context
+
+    diff = "HEAD" + "x" * 100 + "TAIL"
+    truncated = truncate_for_context(diff, 20)
+
+    checks = [
+        (truncate_for_context("short", 20) == "short", "Short text untouched"),
+        (truncated.startswith("HEAD"), "Head preserved"),
+        (truncated.endswith("TAIL"), "Tail preserved"),
+        ("truncated" in truncated, "Truncation marker present"),
+    ]
+
+    for check, desc in checks:
+        status = "✓" if check else "✗"
+        print(f"  {status} {desc}")
+        assert check, desc
+
+    return True
+
+
+def test_diff_extension_filter():
+    """Test excluded file types (incl. .min.js) are dropped from diffs."""
+    print("\nTEST: Diff Extension Filter")
+
+    from utils.github_client import compress_diff
+
+    def block(name):
+        return f"diff --git a/{name} b/{name}\n@@ -1 +1 @@\n+{name} code"
+
+    result = compress_diff(
+        "\n".join(block(n) for n in ("dist/app.min.js", "src/app.js"))
+    )
+    upper = compress_diff(block("app.MIN.CSS"))
+
+    checks = [
+        ("app.min.js" not in result, ".min.js block dropped"),
+        ("+src/app.js code" in result, "Plain .js block kept"),
+        (upper == "", "Suffix match ignores case"),
+    ]
+
+    for check, desc in checks:
+        status = "✓" if check else "✗"
+        print(f"  {status} {desc}")
+        assert check, desc
+
+    return True
+
+
+def test_diff_size_budget():
+    """Test the diff stream is cut at MAX_DIFF_LENGTH and stops reading."""
+    print("\nTEST: Diff Size Budget")
+
+    from unittest.mock import patch
+    from utils import github_client
+
+    lines = [
+        "diff --git a/a.py b/a.py",
+        "@@ -1 +1,2 @@",
+        "+" + "a" * 20,
+        "+" + "b" * 20,
+        "diff --git a/b.py b/b.py",
+        "@@ -1 +1 @@",
+        "+c",
+    ]
+    marker = "\n... [DIFF TRUNCATED DUE TO SIZE LIMIT] ..."
+
+    full = list(github_client.compress_diff_stream(iter(lines)))
+
+    # 25 + 14 + 22 characters (with newlines) cross a 50-char budget
+    with patch.object(github_client, "MAX_DIFF_LENGTH", 50):
+        source = iter(lines)
+        cut = list(github_client.compress_diff_stream(source))
+        joined = github_client.compress_diff("\n".join(lines))
+
+    checks = [
+        (full == lines, "Diff under budget passes through unchanged"),
+        (cut == lines[:3] + [marker], "Block cut at budget with marker"),
+        (list(source) == lines[5:], "Input not read past the cut"),
+        (joined == "\n".join(cut), "compress_diff matches the stream"),
+    ]
+
+    for check, desc in checks:
+        status = "✓" if check else "✗"
+        print(f"  {status} {desc}")
+        assert check, desc
+
+    return True
+
+
+def test_llm_cache_roundtrip():
+    """Test identical LLM requests are served from the memory/disk cache."""
+    print("\nTEST: LLM Response Cache")
+
+    import os
+    import tempfile
+    from unittest.mock import MagicMock
+
+    llm = MagicMock()
+    llm.model_name = "test-model"
+    llm.invoke.return_value = MagicMock(content="cached report")
+    messages = [{"role": "user", "content": "review this"}]
+
+    enabled, cache_dir = llm_cache.LLM_CACHE_ENABLED, llm_cache.LLM_CACHE_DIR
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            llm_cache.LLM_CACHE_ENABLED, llm_cache.LLM_CACHE_DIR = True, tmp
+            first = llm_cache.cached_invoke(llm, messages)
+            second = llm_cache.cached_invoke(llm, messages)
+            llm_cache._memory.clear()
+            from_disk = llm_cache.cached_invoke(llm, messages)
+
+            # Without LLM_CACHE the memory tier still dedupes, but nothing
+            # touches the disk
+            llm_cache._memory.clear()
+            llm_cache.LLM_CACHE_ENABLED, llm_cache.LLM_CACHE_DIR = False, tmp + "/off"
+            memory_only = [llm_cache.cached_invoke(llm, messages) for _ in range(2)]
+            disk_untouched = not os.path.exists(tmp + "/off")
+    finally:
+        llm_cache.LLM_CACHE_ENABLED, llm_cache.LLM_CACHE_DIR = enabled, cache_dir
+        llm_cache._memory.clear()
+
+    checks = [
+        (first.content == "cached report", "Miss returns LLM response"),
+        (second.content == "cached report", "Hit returns cached content"),
+        (from_disk.content == "cached report", "Disk hit after memory is cleared"),
+        (all(r.content == "cached report" for r in memory_only), "Memory hit with disk cache off"),
+        (disk_untouched, "Nothing written to disk with disk cache off"),
+        (llm.invoke.call_count == 2, "LLM invoked once per cold cache"),
+    ]
+
+    for check, desc in checks:
+        status = "✓" if check else "✗"
+        print(f"  {status} {desc}")
+        assert check, desc
 
     return True
 
@@ -221,9 +425,15 @@ def main():
         test_state_structure,
         test_mermaid_validation,
         test_diagram_node_structure,
+        test_diagram_model_routing,
         test_graph_compilation,
         test_supervisor_diagram_formatting,
         test_supervisor_with_diagram,
+        test_comment_reducer_dedup,
+        test_truncate_for_context,
+        test_diff_extension_filter,
+        test_diff_size_budget,
+        test_llm_cache_roundtrip,
         test_circular_imports,
     ]
 
@@ -55,13 +55,9 @@ print("=" * 70)
 print()
 
 # Show file count
-import os
+from pathlib import Path
 
-py_files = []
-for root, dirs, files in os.walk("."):
-    for f in files:
-        if f.endswith(".py") and "test" in root.lower() or "diagram" in f:
-            py_files.append(os.path.join(root, f))
+py_files = set(Path("tests").rglob("*.py")) | set(Path(".").rglob("*diagram*.py"))
 
 print(f"Test & Diagram Files:")
 for f in sorted(py_files):
@@ -1,12 +1,19 @@
 # FOLDER ZA POMOĆNE ALATE
 
-from .github_client import get_pr_diff, post_comment
+from .github_client import get_pr_diff, get_pr_diff_async, post_comment
 from .common import ORCHESTRATOR_PROMPT, LOGIC_PROMPT, STYLE_PROMPT
+from .llm import get_llm
+from .mermaid import is_valid_mermaid_diagram
+from .prompt import truncate_for_context
 
 __all__ = [
     "get_pr_diff",
+    "get_pr_diff_async",
     "post_comment",
     "ORCHESTRATOR_PROMPT",
     "LOGIC_PROMPT",
     "STYLE_PROMPT",
+    "get_llm",
+    "is_valid_mermaid_diagram",
+    "truncate_for_context",
 ]
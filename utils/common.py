@@ -4,6 +4,9 @@ This module exposes system-level prompt templates used by the agents:
 - LOGIC_PROMPT: For security, bugs, and logic analysis (Llama 3.3)
 - STYLE_PROMPT: For PEP8, formatting, and naming conventions (Llama 3.1)
 - ORCHESTRATOR_PROMPT: For synthesizing final reports (Llama 3.3)
+- DIAGRAM_PROMPT: For Mermaid architecture diagrams (Llama 3.3)
+
+SYSTEM_MESSAGES holds each prompt prebuilt as a system chat message.
 """
 
 # ==================== LOGIC AGENT PROMPT ====================
@@ -264,3 +267,15 @@ CONSTRAINTS:
 - NO comments inside the diagram code
 - Verify all parentheses, brackets, and braces are properly closed
 """
+
+
+# ==================== PREBUILT SYSTEM MESSAGES ====================
+
+# Built once at import so every request reuses the same system message
+# (byte-identical prefix, which Groq's prompt cache can reuse across PRs)
+SYSTEM_MESSAGES = {
+    "logic": {"role": "system", "content": LOGIC_PROMPT},
+    "style": {"role": "system", "content": STYLE_PROMPT},
+    "orchestrator": {"role": "system", "content": ORCHESTRATOR_PROMPT},
+    "diagram": {"role": "system", "content": DIAGRAM_PROMPT},
+}
@@ -0,0 +1,33 @@
+"""Loads the local .env file once per process.
+
+Every entry point and agent module used to call `load_dotenv()` on its own,
+re-reading `.env` from disk at each import. Importing this module instead
+(`import utils.env  # noqa: F401`) loads it exactly once. On GitHub Actions
+there is no .env file and the variables come from the workflow.
+"""
+
+from dotenv import load_dotenv
+
+_LOADED = False
+
+
+def load_env() -> None:
+    """
+    Loads `.env` into the process environment unless already done.
+
+    Existing environment variables are never overridden.
+
+    Returns:
+        None
+
+    Example:
+        >>> load_env()
+        >>> load_env()  # no-op, .env is not read again
+    """
+    global _LOADED
+    if not _LOADED:
+        load_dotenv()
+        _LOADED = True
+
+
+load_env()
@@ -1,26 +1,68 @@
 import os
 import re
+import time
+import queue
+import asyncio
+import atexit
 import logging
-import requests
-from github import Github
-from urllib.parse import urlparse
-from dotenv import load_dotenv
+import functools
+from typing import AsyncIterable, AsyncIterator, Iterable, Iterator
+from logging.handlers import QueueHandler, QueueListener
+import httpx
 from langchain_core.tools import tool
+from . import env  # noqa: F401  (loads .env before GITHUB_TOKEN is read)
 
-load_dotenv()
 
-# Configure audit logger
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s [AUDIT] %(levelname)s: %(message)s",
-)
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler that enqueues records without formatting them.
+
+    The stock `prepare()` runs the full formatter on the calling thread.
+    Here only the %-args are interpolated there, so a mutable argument is
+    logged with its value at call time; the formatter (timestamp, layout,
+    traceback text) runs in the listener thread. Records never leave the
+    process, so exc_info is kept as-is rather than pre-rendered.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+# Configure audit logger. Records are only enqueued on the calling thread;
+# a background listener formats them and writes to stderr. Like
+# basicConfig, this leaves an already-configured root logger alone.
+_root_logger = logging.getLogger()
+if not _root_logger.handlers:
+    _log_queue = queue.SimpleQueue()
+    _stderr_handler = logging.StreamHandler()
+    _stderr_handler.setFormatter(
+        logging.Formatter("%(asctime)s [AUDIT] %(levelname)s: %(message)s")
+    )
+    _log_listener = QueueListener(_log_queue, _stderr_handler)
+    _log_listener.start()
+    atexit.register(_log_listener.stop)
+
+    _root_logger.addHandler(_DeferredQueueHandler(_log_queue))
+    _root_logger.setLevel(logging.INFO)
 
 GITHUB_TOKEN = os.getenv("GITHUB_TOKEN")
 if not GITHUB_TOKEN:
     raise RuntimeError("GITHUB_TOKEN not found in environment variables.")
 
-g = Github(GITHUB_TOKEN)
 
+# --- HTTP Client Parameters ---
+HTTP_TIMEOUT = 30  # Seconds before a GitHub request is abandoned
+_HTTP_LIMITS = httpx.Limits(max_keepalive_connections=20)
+HTTP_RETRIES = 3  # Extra attempts for GETs that fail with a 5xx
+HTTP_RETRY_BACKOFF = 0.5  # Seconds before the first retry, doubled each time
+GITHUB_API_URL = "https://api.github.com"
+# Sent with every request; set once on the shared clients
+_AUTH_HEADERS = {"Authorization": f"Bearer {GITHUB_TOKEN}"}
+_API_HEADERS = {"Accept": "application/vnd.github+json"}
+# Asks the pulls endpoint for the raw diff instead of the JSON PR object
+_DIFF_HEADERS = {"Accept": "application/vnd.github.v3.diff"}
 
 # --- Diff Compression Parameters ---
 MAX_DIFF_LENGTH = 24000  # Global hard limit on returned characters
@@ -42,10 +84,20 @@ EXCLUDED_EXTENSIONS = {
     ".pyc",
     ".md",
 }
+# Matched as suffixes so multi-part extensions like ".min.js" are caught
+_EXCLUDED_SUFFIXES = tuple(ext.lower() for ext in EXCLUDED_EXTENSIONS)
 
 # Pre-compiled Regex Patterns
 file_header_pattern = re.compile(r"^diff --git a/(.*) b/(.*)")
 hunk_header_pattern = re.compile(r"^@@\s*(-\d+(?:,\d+)?)\s*\+(\d+(?:,\d+)?)\s*@@")
+# Added Python 'def function(' or 'class Class:' / 'class Class(' line
+signature_pattern = re.compile(r"^\+\s*(?:def\s+\w+\s*\(|class\s+\w+\s*[:(])")
+# https://github.com/<owner>/<repo>/pull/<n>, optionally followed by a
+# subpage, query or fragment (scheme and host are case-insensitive)
+pr_url_pattern = re.compile(
+    r"(?i:https://github\.com)/([^/?#]+)/([^/?#]+)/pull/(\d+)(?:[/?#]|$)"
+)
+_GITHUB_PREFIX = "https://github.com/"
 
 
 def _is_text_extension(filename: str) -> bool:
@@ -63,9 +115,83 @@ def _is_text_extension(filename: str) -> bool:
         True
         >>> _is_text_extension("package-lock.json")
         False
+        >>> _is_text_extension("dist/app.min.js")
+        False
     """
-    ext = os.path.splitext(filename)[1].lower()
-    return ext not in EXCLUDED_EXTENSIONS
+    return not filename.lower().endswith(_EXCLUDED_SUFFIXES)
+
+
+def _is_file_header(line: str):
+    """
+    Matches a 'diff --git a/... b/...' file header line.
+
+    A plain startswith check rejects the (overwhelmingly common) non-header
+    lines before the regex is consulted.
+
+    Args:
+        line (str): A single diff line.
+
+    Returns:
+        re.Match | None: The file_header_pattern match, or None.
+
+    Example:
+        >>> _is_file_header("diff --git a/main.py b/main.py").group(1)
+        'main.py'
+        >>> _is_file_header("+x = 1") is None
+        True
+    """
+    if not line.startswith("diff --git "):
+        return None
+    return file_header_pattern.match(line)
+
+
+def _is_py_sig(line: str) -> bool:
+    """
+    Checks whether an added line is a Python 'def'/'class' signature.
+
+    String checks drop every line that does not start with 'def' or 'class'
+    after the '+' and indentation; only those candidates are confirmed with
+    signature_pattern, so the result is the same as matching it directly.
+
+    Args:
+        line (str): An added ('+') diff line.
+
+    Returns:
+        bool: True if the line opens a function or class definition.
+
+    Example:
+        >>> _is_py_sig("+    def run(self):")
+        True
+        >>> _is_py_sig("+    default = 1")
+        False
+    """
+    t = line[1:].lstrip()
+    if not t.startswith(("def", "class")):
+        return False
+    return signature_pattern.match(line) is not None
+
+
+def _signature_lines(seq_lines: list) -> list:
+    """
+    Returns the Python signature lines in a run of added lines.
+
+    One substring scan over the joined run rules out the common case of a
+    run with no 'def'/'class' text at all before any line is checked.
+
+    Args:
+        seq_lines (list): Consecutive added ('+') diff lines.
+
+    Returns:
+        list: The lines accepted by _is_py_sig, in order.
+
+    Example:
+        >>> _signature_lines(["+x = 1", "+def run():", "+    pass"])
+        ['+def run():']
+    """
+    joined = "\n".join(seq_lines)
+    if "def" not in joined and "class" not in joined:
+        return []
+    return [s for s in seq_lines if _is_py_sig(s)]
 
 
 def _collapse_sequence(seq_lines: list, prefix_char: str, max_keep: int = 10) -> list:
@@ -105,6 +231,10 @@ def compress_diff(raw_diff: str) -> str:
     """
     Compresses a raw unified diff string for efficient review and LLM token usage.
 
+    A convenience wrapper around `compress_diff_stream` for callers (mainly
+    tests) that already hold the whole diff; get_pr_diff streams the
+    download into compress_diff_stream directly.
+
     The compression strategy involves:
     1. Skipping files with excluded extensions (binary, lockfiles).
     2. Truncating the global output if it exceeds MAX_DIFF_LENGTH.
@@ -143,120 +273,205 @@ def compress_diff(raw_diff: str) -> str:
           ... [40 unchanged lines collapsed] ...
          return True
     """
-    lines = raw_diff.splitlines()
-    out_lines = []
-    idx = 0
+    return "\n".join(compress_diff_stream(raw_diff.splitlines()))
+
+
+def compress_diff_stream(line_iter: Iterable[str]) -> Iterator[str]:
+    """
+    Compresses a diff given line by line, yielding the output lines.
+
+    Each file block is compressed as soon as the next file header arrives,
+    so only one file's lines are held at a time, and lines of excluded files
+    are dropped without buffering. Once MAX_DIFF_LENGTH is reached the input
+    is no longer read, which lets a streamed download stop early.
+
+    Args:
+        line_iter (Iterable[str]): Diff lines without line terminators.
+
+    Yields:
+        str: Compressed diff lines; join them with "\\n" for compress_diff's
+        output.
+
+    Example:
+        >>> list(compress_diff_stream(["diff --git a/a.md b/a.md", "+x"]))
+        []
+    """
     total_chars = 0
+    filename, block = None, []  # Leading metadata until the first header
 
-    while idx < len(lines):
-        line = lines[idx]
-        header_match = file_header_pattern.match(line)
-
-        if header_match:
-            filename = header_match.group(1)
-
-            # 1. Skip excluded files
-            if not _is_text_extension(filename):
-                logging.info(f"Skipping binary/excluded diff for {filename}")
-                idx += 1
-                # Fast-forward until next diff header or EOF
-                while idx < len(lines) and not file_header_pattern.match(lines[idx]):
-                    idx += 1
-                continue
-
-            # 2. Collect current file block
-            file_block = [line]
-            idx += 1
-            while idx < len(lines) and not file_header_pattern.match(lines[idx]):
-                file_block.append(lines[idx])
-                idx += 1
-
-            # 3. Process the file block
-            processed_file_lines = _process_file_block(filename, file_block)
-
-            # 4. Append and check global limit
-            for l in processed_file_lines:
-                out_lines.append(l)
-                total_chars += len(l) + 1  # +1 for newline
-
-                if total_chars >= MAX_DIFF_LENGTH:
-                    out_lines.append("\n... [DIFF TRUNCATED DUE TO SIZE LIMIT] ...")
-                    logging.warning("Diff truncated due to size limit.")
-                    return "\n".join(out_lines)
+    for line in line_iter:
+        header_match = _is_file_header(line)
+        if not header_match:
+            if block is not None:
+                block.append(line)
+            continue
 
-        else:
-            # Metadata lines (e.g., initial headers before any file diff)
-            out_lines.append(line)
-            total_chars += len(line) + 1
-            if total_chars >= MAX_DIFF_LENGTH:
-                out_lines.append("\n... [DIFF TRUNCATED DUE TO SIZE LIMIT] ...")
-                logging.warning("Diff truncated due to size limit.")
-                return "\n".join(out_lines)
-            idx += 1
+        out, total_chars = _flush_block(filename, block, total_chars)
+        yield from out
+        if total_chars >= MAX_DIFF_LENGTH:
+            return
+        filename, block = _start_block(header_match, line)
+
+    out, _ = _flush_block(filename, block, total_chars)
+    yield from out
+
+
+async def acompress_diff_stream(line_iter: AsyncIterable[str]) -> AsyncIterator[str]:
+    """
+    Async variant of compress_diff_stream for `httpx.Response.aiter_lines`.
+
+    Args:
+        line_iter (AsyncIterable[str]): Diff lines without line terminators.
+
+    Yields:
+        str: Compressed diff lines, as compress_diff_stream.
+    """
+    total_chars = 0
+    filename, block = None, []  # Leading metadata until the first header
 
-    return "\n".join(out_lines)
+    async for line in line_iter:
+        header_match = _is_file_header(line)
+        if not header_match:
+            if block is not None:
+                block.append(line)
+            continue
 
+        out, total_chars = _flush_block(filename, block, total_chars)
+        for l in out:
+            yield l
+        if total_chars >= MAX_DIFF_LENGTH:
+            return
+        filename, block = _start_block(header_match, line)
 
-def _process_file_block(filename: str, block_lines: list) -> list:
+    out, _ = _flush_block(filename, block, total_chars)
+    for l in out:
+        yield l
+
+
+def _start_block(header_match: re.Match, line: str) -> tuple:
+    """
+    Opens a new file block at a `diff --git` header line.
+
+    Args:
+        header_match (re.Match): The file header match for `line`.
+        line (str): The header line itself.
+
+    Returns:
+        tuple: (filename, block) where block is the list collecting the
+        file's lines, or None when the file is excluded and skipped.
+    """
+    filename = header_match.group(1)
+    if not _is_text_extension(filename):
+        logging.info(f"Skipping binary/excluded diff for {filename}")
+        return filename, None
+    return filename, [line]
+
+
+def _flush_block(filename: str | None, block: list | None, total_chars: int) -> tuple:
+    """
+    Compresses a finished block and cuts it to the remaining size budget.
+
+    Args:
+        filename (str | None): The block's file, or None for the metadata
+            lines before the first file header.
+        block (list | None): The block's lines; None for a skipped file.
+        total_chars (int): Characters already emitted.
+
+    Returns:
+        tuple: (lines to emit, new character total); a total of at least
+        MAX_DIFF_LENGTH means the output was truncated.
+    """
+    if not block:
+        return [], total_chars
+
+    if filename is None:
+        out_lines = block  # Metadata passes through as-is
+    else:
+        out_lines = []
+        _process_file_block(filename, block, out_lines)
+    return out_lines, _trim_to_limit(out_lines, total_chars)
+
+
+def _trim_to_limit(out_lines: list, total_chars: int) -> int:
+    """
+    Cuts a finished block so the output stays within MAX_DIFF_LENGTH.
+
+    The block's size is computed in one pass; only a block that crosses
+    the limit is walked line by line to find the exact cut-off, after which
+    the rest is dropped and the truncation marker appended.
+
+    Args:
+        out_lines (list): The block's output lines (truncated in place).
+        total_chars (int): Characters (including newlines) emitted before it.
+
+    Returns:
+        int: The new character total; >= MAX_DIFF_LENGTH means truncated.
+
+    Example:
+        >>> _trim_to_limit(["+a", "+b"], 0)
+        6
+    """
+    block_len = sum(map(len, out_lines)) + len(out_lines)  # +1 per newline
+    if total_chars + block_len < MAX_DIFF_LENGTH:
+        return total_chars + block_len
+
+    for k, l in enumerate(out_lines):
+        total_chars += len(l) + 1  # +1 for newline
+
+        if total_chars >= MAX_DIFF_LENGTH:
+            del out_lines[k + 1 :]
+            out_lines.append("\n... [DIFF TRUNCATED DUE TO SIZE LIMIT] ...")
+            logging.warning("Diff truncated due to size limit.")
+            break
+
+    return total_chars
+
+
+def _process_file_block(filename: str, block_lines: list, out: list) -> None:
     """
     Parses a single file's diff lines into hunks and applies compression.
 
     Args:
         filename (str): Name of the file.
         block_lines (list): List of strings representing the raw diff for this file.
-
-    Returns:
-        list: A list of strings representing the compressed diff for this file.
-    """
-    out = []
-    hunks = []
-    cur_hunk = None
-    header_lines = []
-
-    # Split block into Headers and Hunks
-    for line in block_lines:
-        if hunk_header_pattern.match(line):
-            cur_hunk = {"header": line, "lines": []}
-            hunks.append(cur_hunk)
-        else:
-            if cur_hunk is None:
-                header_lines.append(line)
-            else:
-                cur_hunk["lines"].append(line)
+        out (list): Output lines; the compressed diff for this file is
+            appended to it.
+    """
+    # Hunks are the slices between consecutive hunk headers (the last one
+    # runs to the end of the block); cheap prefix test first, the regex
+    # only confirms "@@" lines
+    hunk_starts = [
+        i
+        for i, line in enumerate(block_lines)
+        if line.startswith("@@") and hunk_header_pattern.match(line)
+    ]
 
     # Always keep file headers (index, ---, +++)
-    if header_lines:
-        out.extend(header_lines)
+    out.extend(block_lines[: hunk_starts[0]] if hunk_starts else block_lines)
 
-    if not hunks:
-        return out
+    if not hunk_starts:
+        return
 
     # Limit the number of hunks per file
-    if len(hunks) > MAX_HUNKS_PER_FILE:
-        keep = hunks[:MAX_HUNKS_PER_FILE]
-        dropped = len(hunks) - MAX_HUNKS_PER_FILE
+    dropped = max(len(hunk_starts) - MAX_HUNKS_PER_FILE, 0)
+    if dropped > 0:
         logging.info(
             f"File {filename}: {dropped} hunks omitted due to MAX_HUNKS_PER_FILE."
         )
-    else:
-        keep = hunks
-        dropped = 0
+    hunk_ends = hunk_starts[1:] + [len(block_lines)]
 
     # Check if we should apply Python-specific signature preservation
     is_python = filename.lower().endswith(".py")
 
-    for h in keep:
-        out.append(h["header"])
-        compressed = _compress_hunk_lines(h["lines"], is_python)
-        out.extend(compressed)
+    for start, end in zip(hunk_starts[:MAX_HUNKS_PER_FILE], hunk_ends):
+        out.append(block_lines[start])
+        _compress_hunk_lines(block_lines[start + 1 : end], is_python, out)
 
     if dropped > 0:
         out.append(f"... [ {dropped} additional hunks omitted for {filename} ]")
 
-    return out
 
-
-def _compress_hunk_lines(hunk_lines: list, is_python: bool) -> list:
+def _compress_hunk_lines(hunk_lines: list, is_python: bool, out: list) -> None:
     """
     Compresses the lines within a single hunk.
 
@@ -268,24 +483,13 @@ def _compress_hunk_lines(hunk_lines: list, is_python: bool) -> list:
     Args:
         hunk_lines (list): Lines inside the hunk (excluding the @@ header).
         is_python (bool): Whether to look for Python function/class signatures.
-
-    Returns:
-        list: Compressed lines.
+        out (list): Output lines; the compressed hunk lines are appended to it.
     """
-    out = []
-    i = 0
-    n = len(hunk_lines)
-
-    while i < n:
-        line = hunk_lines[i]
+    for c, start, end in _runs(hunk_lines):
+        seq = hunk_lines[start:end]
 
         # --- Unchanged Lines (Context) ---
-        if line.startswith(" "):
-            j = i
-            while j < n and hunk_lines[j].startswith(" "):
-                j += 1
-            seq = hunk_lines[i:j]
-
+        if c == " ":
             if len(seq) > CONTEXT_LINES * 2:
                 # Keep head and tail, collapse middle
                 out.extend(seq[:CONTEXT_LINES])
@@ -295,67 +499,216 @@ def _compress_hunk_lines(hunk_lines: list, is_python: bool) -> list:
                 out.extend(seq[-CONTEXT_LINES:])
             else:
                 out.extend(seq)
-            i = j
 
         # --- Added Lines ---
-        elif line.startswith("+"):
-            j = i
-            while j < n and hunk_lines[j].startswith("+"):
-                j += 1
-            seq = hunk_lines[i:j]
-
-            if is_python:
-                # Regex to find 'def function():' or 'class Class:'
-                sig_pattern = r"^\+(\s*)def\s+\w+\s*\(|^\+(\s*)class\s+\w+\s*[:\(]"
-                sig_lines = [s for s in seq if re.match(sig_pattern, s)]
-
-                if sig_lines and len(seq) > MAX_CONSECUTIVE_ADDED:
-                    # Collapse, but try to re-insert signatures
-                    sig_set = set(sig_lines)
-                    merged = _collapse_sequence(seq, "+", max_keep=10)
-
-                    # Ensure signature lines are present in the final output
-                    # Note: We use a simple list check. If the signature was collapsed,
-                    # we insert it back.
-                    final_merged = []
-                    # First, populate from the collapsed result
-                    for ln in merged:
-                        final_merged.append(ln)
-
-                    # Now inject missing signatures.
-                    # We insert them before the last element (tail) to keep them somewhat in context,
-                    # or append if list is short.
-                    for s in sig_set:
-                        if s not in final_merged:
-                            # Insert before the last item if possible to keep it visible
-                            if len(final_merged) > 1:
-                                final_merged.insert(-1, s)
-                            else:
-                                final_merged.append(s)
-                    out.extend(final_merged)
+        elif c == "+":
+            if len(seq) <= MAX_CONSECUTIVE_ADDED:
+                # Short runs are kept whole: no collapse, no signature scan
+                out.extend(seq)
+            elif is_python and (sig_lines := _signature_lines(seq)):
+                # Collapse, but try to re-insert signatures
+                merged = _collapse_sequence(seq, "+", max_keep=10)
+
+                # Ensure signature lines are present in the final output.
+                # dict.fromkeys dedups while keeping source order, so the
+                # rescued signatures come out in the order they were added.
+                present = set(merged)
+                missing = [s for s in dict.fromkeys(sig_lines) if s not in present]
+
+                # Insert them before the last element (tail) to keep them
+                # somewhat in context, or append if the list is short.
+                if len(merged) > 1:
+                    merged[-1:-1] = missing
                 else:
-                    out.extend(
-                        _collapse_sequence(seq, "+", max_keep=MAX_CONSECUTIVE_ADDED)
-                    )
+                    merged.extend(missing)
+                out.extend(merged)
             else:
                 out.extend(_collapse_sequence(seq, "+", max_keep=MAX_CONSECUTIVE_ADDED))
-            i = j
 
         # --- Removed Lines ---
-        elif line.startswith("-"):
-            j = i
-            while j < n and hunk_lines[j].startswith("-"):
-                j += 1
-            seq = hunk_lines[i:j]
-            out.extend(_collapse_sequence(seq, "-", max_keep=MAX_CONSECUTIVE_REMOVED))
-            i = j
+        elif c == "-":
+            if len(seq) <= MAX_CONSECUTIVE_REMOVED:
+                out.extend(seq)
+            else:
+                out.extend(
+                    _collapse_sequence(seq, "-", max_keep=MAX_CONSECUTIVE_REMOVED)
+                )
 
         # --- Metadata/Header Lines ---
         else:
-            out.append(line)
-            i += 1
+            out.extend(seq)
+
+
+def _runs(lines: list) -> Iterator[tuple]:
+    """
+    Splits lines into maximal runs that share the same first character.
+
+    Args:
+        lines (list): Hunk lines.
+
+    Yields:
+        tuple: (prefix, start, end) with `lines[start:end]` being the run.
+
+    Example:
+        >>> list(_runs([" a", " b", "+c", "-d"]))
+        [(' ', 0, 2), ('+', 2, 3), ('-', 3, 4)]
+    """
+    i = 0
+    n = len(lines)
+    while i < n:
+        c = lines[i][:1]
+        j = i + 1
+        while j < n and lines[j][:1] == c:
+            j += 1
+        yield c, i, j
+        i = j
+
+
+class _RetryTransport(httpx.HTTPTransport):
+    """
+    Transport that retries GET requests answered with a 5xx status.
+
+    Connection failures are retried by httpx itself (``retries=``); this
+    covers GitHub's transient 502/503 responses. Only GETs are retried so a
+    comment POST is never sent twice.
+    """
 
-    return out
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(HTTP_RETRIES):
+            response = super().handle_request(request)
+            if request.method != "GET" or response.status_code < 500:
+                return response
+            response.close()
+            time.sleep(HTTP_RETRY_BACKOFF * 2**attempt)
+        return super().handle_request(request)
+
+
+class _AsyncRetryTransport(httpx.AsyncHTTPTransport):
+    """Async counterpart of _RetryTransport."""
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for attempt in range(HTTP_RETRIES):
+            response = await super().handle_async_request(request)
+            if request.method != "GET" or response.status_code < 500:
+                return response
+            await response.aclose()
+            await asyncio.sleep(HTTP_RETRY_BACKOFF * 2**attempt)
+        return await super().handle_async_request(request)
+
+
+@functools.lru_cache(maxsize=1)
+def _get_http_client() -> httpx.Client:
+    """
+    Returns the shared blocking HTTP client, creating it on first use.
+
+    Keeping a single client keeps TCP/TLS connections to GitHub alive
+    between requests instead of handshaking on every call. The auth header
+    is set once here rather than rebuilt per request.
+
+    Returns:
+        httpx.Client: The pooled client.
+    """
+    return httpx.Client(
+        timeout=HTTP_TIMEOUT,
+        headers=_AUTH_HEADERS,
+        transport=_RetryTransport(limits=_HTTP_LIMITS, retries=HTTP_RETRIES),
+        follow_redirects=True,
+    )
+
+
+@functools.lru_cache(maxsize=1)
+def _get_async_http_client() -> httpx.AsyncClient:
+    """
+    Returns the shared async HTTP client, creating it on first use.
+
+    The client's connections belong to the event loop that first uses it,
+    so it is meant for the single `asyncio.run` in main.py.
+
+    Returns:
+        httpx.AsyncClient: The pooled async client.
+    """
+    return httpx.AsyncClient(
+        timeout=HTTP_TIMEOUT,
+        headers=_AUTH_HEADERS,
+        transport=_AsyncRetryTransport(limits=_HTTP_LIMITS, retries=HTTP_RETRIES),
+        follow_redirects=True,
+    )
+
+
+@functools.lru_cache(maxsize=64)
+def _parse_pr_url(pr_url: str) -> tuple:
+    """
+    Validates a GitHub PR URL and splits it into its parts.
+
+    Args:
+        pr_url (str): URL to the pull request.
+
+    Returns:
+        tuple: (owner, repo, pr_number) with pr_number as an int.
+
+    Raises:
+        ValueError: If the URL is invalid.
+
+    Example:
+        >>> _parse_pr_url("https://github.com/octocat/Hello-World/pull/1347")
+        ('octocat', 'Hello-World', 1347)
+    """
+    m = pr_url_pattern.match(pr_url)
+    if m is None:
+        if not pr_url.lower().startswith(_GITHUB_PREFIX):
+            raise ValueError("PR URL must be from github.com.")
+        raise ValueError("Invalid PR URL format.")
+    owner, repo, pr_number = m.groups()
+    return owner, repo, int(pr_number)
+
+
+def _diff_request(pr_url: str) -> tuple:
+    """
+    Validates a PR URL and derives the API URL its diff is fetched from.
+
+    The diff itself is selected with the `_DIFF_HEADERS` media type, which
+    avoids the redirect from github.com to the diff host.
+
+    Args:
+        pr_url (str): URL to the pull request.
+
+    Returns:
+        tuple: (owner, repo, pr_number, diff_url).
+
+    Raises:
+        ValueError: If the URL is invalid.
+
+    Example:
+        >>> _diff_request("https://github.com/octocat/Hello-World/pull/1347")[3]
+        'https://api.github.com/repos/octocat/Hello-World/pulls/1347'
+    """
+    owner, repo, pr_number = _parse_pr_url(pr_url)
+    diff_url = f"{GITHUB_API_URL}/repos/{owner}/{repo}/pulls/{pr_number}"
+    return owner, repo, pr_number, diff_url
+
+
+def _diff_result(
+    pr_url: str, owner: str, pr_number: int, compressed_diff: str, downloaded: int
+) -> dict:
+    """
+    Packs a compressed diff into the dict returned by get_pr_diff.
+
+    Args:
+        pr_url (str): URL to the pull request (for logging).
+        owner (str): The repository owner.
+        pr_number (int): The pull request number.
+        compressed_diff (str): The compressed diff.
+        downloaded (int): Bytes read before the download finished or was
+            stopped at the size limit.
+
+    Returns:
+        dict: "owner", "pr_id" and the compressed "diff".
+    """
+    logging.info(
+        f"SUCCESS: get_pr_diff for PR {pr_url}. Downloaded: {downloaded} bytes, Compressed: {len(compressed_diff)}"
+    )
+
+    return {"owner": owner, "pr_id": pr_number, "diff": compressed_diff}
 
 
 def get_pr_diff(pr_url: str) -> dict:
@@ -373,7 +726,7 @@ def get_pr_diff(pr_url: str) -> dict:
 
     Raises:
         ValueError: If the URL is invalid.
-        requests.exceptions.RequestException: If the GitHub API call fails.
+        httpx.HTTPError: If the GitHub API call fails.
 
     Example:
         >>> result = get_pr_diff("https://github.com/octocat/Hello-World/pull/1347")
@@ -382,26 +735,55 @@ def get_pr_diff(pr_url: str) -> dict:
         ...
     """
     try:
-        parsed = urlparse(pr_url)
-        if parsed.scheme != "https" or parsed.netloc.lower() != "github.com":
-            raise ValueError("PR URL must be from github.com.")
-        path_parts = parsed.path.strip("/").split("/")
-        if len(path_parts) < 4 or path_parts[2] != "pull":
-            raise ValueError("Invalid PR URL format.")
-        owner, _, _, pr_number = path_parts[:4]
-        diff_url = pr_url.rstrip("/") + ".diff"
-        headers = {"Authorization": f"token {GITHUB_TOKEN}"}
-        resp = requests.get(diff_url, headers=headers)
-        resp.raise_for_status()
+        owner, _, pr_number, diff_url = _diff_request(pr_url)
+        # Streamed: lines go straight into the compressor, and leaving the
+        # block closes the response once the size limit stops the read
+        with _get_http_client().stream(
+            "GET", diff_url, headers=_DIFF_HEADERS
+        ) as resp:
+            resp.raise_for_status()
+            compressed_diff = "\n".join(compress_diff_stream(resp.iter_lines()))
+            downloaded = resp.num_bytes_downloaded
+
+        return _diff_result(pr_url, owner, pr_number, compressed_diff, downloaded)
 
-        raw_diff = resp.text
-        compressed_diff = compress_diff(raw_diff)
+    except Exception as e:
+        logging.error(f"FAIL: get_pr_diff for PR {pr_url} - {e}")
+        raise
 
-        logging.info(
-            f"SUCCESS: get_pr_diff for PR {pr_url}. Original size: {len(raw_diff)}, Compressed: {len(compressed_diff)}"
-        )
 
-        return {"owner": owner, "pr_id": int(pr_number), "diff": compressed_diff}
+async def get_pr_diff_async(pr_url: str) -> dict:
+    """
+    Async variant of get_pr_diff that awaits the download on the event loop.
+
+    Args:
+        pr_url (str): URL to the pull request (e.g., https://github.com/owner/repo/pull/123).
+
+    Returns:
+        dict: Same as get_pr_diff ("owner", "pr_id", "diff").
+
+    Raises:
+        ValueError: If the URL is invalid.
+        httpx.HTTPError: If the GitHub API call fails.
+
+    Example:
+        >>> result = await get_pr_diff_async("https://github.com/octocat/Hello-World/pull/1347")
+        >>> result["pr_id"]
+        1347
+    """
+    try:
+        owner, _, pr_number, diff_url = _diff_request(pr_url)
+        async with _get_async_http_client().stream(
+            "GET", diff_url, headers=_DIFF_HEADERS
+        ) as resp:
+            resp.raise_for_status()
+            compressed_lines = [
+                l async for l in acompress_diff_stream(resp.aiter_lines())
+            ]
+            downloaded = resp.num_bytes_downloaded
+
+        compressed_diff = "\n".join(compressed_lines)
+        return _diff_result(pr_url, owner, pr_number, compressed_diff, downloaded)
 
     except Exception as e:
         logging.error(f"FAIL: get_pr_diff for PR {pr_url} - {e}")
@@ -422,16 +804,15 @@ def post_comment(pr_url: str, comment_body: str):
             post_comment("https://github.com/octocat/Hello-World/pull/1347", "Nice work!")
     """
     try:
-        parsed = urlparse(pr_url)
-        if parsed.scheme != "https" or parsed.netloc.lower() != "github.com":
-            raise ValueError("PR URL must be from github.com.")
-        path_parts = parsed.path.strip("/").split("/")
-        if len(path_parts) < 4 or path_parts[2] != "pull":
-            raise ValueError("Invalid PR URL format.")
-        owner, repo, _, pr_number = path_parts[:4]
-        repo_obj = g.get_repo(f"{owner}/{repo}")
-        pr = repo_obj.get_pull(int(pr_number))
-        pr.create_issue_comment(comment_body)
+        owner, repo, pr_number = _parse_pr_url(pr_url)
+
+        # PR comments are issue comments: one POST, no repo/PR lookups
+        resp = _get_http_client().post(
+            f"{GITHUB_API_URL}/repos/{owner}/{repo}/issues/{pr_number}/comments",
+            json={"body": comment_body},
+            headers=_API_HEADERS,
+        )
+        resp.raise_for_status()
         logging.info(f"SUCCESS: post_comment to PR {pr_url}")
     except Exception as e:
         logging.error(f"FAIL: post_comment to PR {pr_url} - {e}")
@@ -0,0 +1,42 @@
+"""Shared Groq chat clients for the agents.
+
+Every agent gets its client from `get_llm`, so each model/temperature pair
+is created once per process and its HTTP connection pool is reused between
+requests. The memo is process-global; `get_llm.cache_clear()` resets it.
+"""
+
+import functools
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from langchain_groq import ChatGroq
+
+
+@functools.lru_cache(maxsize=8)
+def get_llm(model_name: str, temperature: float = 0.0) -> "ChatGroq":
+    """
+    Returns a shared client for `model_name`, creating it on first use.
+
+    langchain_groq is imported here rather than at module level: it is only
+    needed once an LLM call is actually made, not for oversized-PR aborts,
+    empty diffs or diffs without structural changes.
+
+    Clients are memoized for the whole process, so patching
+    `langchain_groq.ChatGroq` only affects clients created afterwards. Tests
+    that patch it must call `get_llm.cache_clear()` before and after, or an
+    earlier (real or mocked) client is returned instead.
+
+    Args:
+        model_name: The Groq model identifier.
+        temperature: Sampling temperature for the client.
+
+    Returns:
+        ChatGroq: The cached client for that model and temperature.
+
+    Example:
+        >>> get_llm("llama-3.1-8b-instant") is get_llm("llama-3.1-8b-instant")
+        True
+    """
+    from langchain_groq import ChatGroq
+
+    return ChatGroq(temperature=temperature, model_name=model_name)
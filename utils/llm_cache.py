@@ -0,0 +1,232 @@
+"""Response cache for LLM calls.
+
+Responses are keyed on the model name and messages. Recent entries are
+always kept in memory, so a long-running process (webhook redeliveries,
+repeated reviews of the same PR) does not resend a byte-identical prompt.
+
+CI often re-runs the same review in a fresh process (force-push with no
+changes, re-run of a failed job). When enabled with `LLM_CACHE=true`,
+responses are also stored under `LLM_CACHE_DIR` (default
+`~/.cache/pr_review`), so a re-run is served from disk instead of the
+network.
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+from collections import OrderedDict
+from langchain_core.messages import AIMessage
+
+logger = logging.getLogger(__name__)
+
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE", "false").lower() == "true"
+LLM_CACHE_DIR = os.path.expanduser(os.getenv("LLM_CACHE_DIR", "~/.cache/pr_review"))
+DEFAULT_TTL = 86400  # Seconds a cached response stays valid (1 day)
+_MEMORY_MAX_ENTRIES = 256
+
+# key -> (stored_at, response), oldest first
+_memory: "OrderedDict[str, tuple]" = OrderedDict()
+_memory_lock = threading.Lock()
+
+
+def _cache_key(messages: list, model_name: str) -> str:
+    """
+    Computes the cache key for a model name and message list.
+
+    Args:
+        messages: The chat messages sent to the LLM.
+        model_name: The model the messages are sent to.
+
+    Returns:
+        str: Hex BLAKE2b-128 digest identifying the request.
+
+    Example:
+        >>> len(_cache_key([{"role": "user", "content": "hi"}], "llama"))
+        32
+    """
+    payload = json.dumps([model_name, messages], sort_keys=True)
+    return hashlib.blake2b(payload.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _lookup(key: str, ttl: int):
+    """
+    Returns a cached response from memory, falling back to disk.
+
+    The disk is only consulted when `LLM_CACHE_ENABLED`; disk hits are
+    promoted into the in-memory LRU.
+
+    Args:
+        key: The cache key from `_cache_key`.
+        ttl: Maximum age of the cache entry in seconds.
+
+    Returns:
+        The cached response, or None on a miss.
+
+    Example:
+        >>> _lookup("missing-key", 60) is None
+        True
+    """
+    with _memory_lock:
+        entry = _memory.get(key)
+        if entry is not None:
+            if time.time() - entry[0] <= ttl:
+                _memory.move_to_end(key)
+                return entry[1]
+            del _memory[key]
+
+    if not LLM_CACHE_ENABLED:
+        return None
+    cached = _read(key, ttl)
+    if cached is not None:
+        _remember(key, cached)
+    return cached
+
+
+def _remember(key: str, response) -> None:
+    """
+    Adds a response to the in-memory LRU, evicting the oldest entry if full.
+
+    Args:
+        key: The cache key from `_cache_key`.
+        response: The message to keep.
+
+    Returns:
+        None
+    """
+    with _memory_lock:
+        _memory[key] = (time.time(), response)
+        _memory.move_to_end(key)
+        if len(_memory) > _MEMORY_MAX_ENTRIES:
+            _memory.popitem(last=False)
+
+
+def _read(key: str, ttl: int) -> AIMessage | None:
+    """
+    Loads a cached response if present and not older than `ttl` seconds.
+
+    Args:
+        key: The cache key from `_cache_key`.
+        ttl: Maximum age of the cache entry in seconds.
+
+    Returns:
+        AIMessage | None: The cached response, or None on a miss.
+
+    Example:
+        >>> _read("missing-key", 60) is None
+        True
+    """
+    path = os.path.join(LLM_CACHE_DIR, f"{key}.json")
+    try:
+        if time.time() - os.path.getmtime(path) > ttl:
+            return None
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        return AIMessage(
+            content=data["content"],
+            response_metadata=data.get("response_metadata", {}),
+        )
+    except (OSError, ValueError, KeyError):
+        return None
+
+
+def _write(key: str, response) -> None:
+    """
+    Stores a response atomically (temp file + rename).
+
+    Args:
+        key: The cache key from `_cache_key`.
+        response: The message returned by the LLM.
+
+    Returns:
+        None
+
+    Example:
+        >>> _write(key, llm.invoke(messages))
+    """
+    metadata = getattr(response, "response_metadata", None)
+    data = {
+        "content": response.content,
+        "response_metadata": metadata if isinstance(metadata, dict) else {},
+    }
+    try:
+        os.makedirs(LLM_CACHE_DIR, exist_ok=True)
+        with tempfile.NamedTemporaryFile(
+            "w", dir=LLM_CACHE_DIR, suffix=".tmp", delete=False, encoding="utf-8"
+        ) as f:
+            json.dump(data, f, default=str)
+        os.replace(f.name, os.path.join(LLM_CACHE_DIR, f"{key}.json"))
+    except OSError as e:
+        logger.warning("llm_cache: Could not write cache entry - %s", e)
+
+
+def cached_invoke(llm, messages: list, model_name: str = None, ttl: int = DEFAULT_TTL):
+    """
+    Invokes the LLM, serving identical requests from memory or disk.
+
+    Responses are always kept in memory; they are also written to disk
+    when `LLM_CACHE_ENABLED`.
+
+    Args:
+        llm: The chat model client (e.g. ChatGroq).
+        messages: The chat messages to send.
+        model_name: Model identifier for the cache key. Defaults to
+            `llm.model_name`.
+        ttl: Maximum age of a reusable cache entry in seconds.
+
+    Returns:
+        The LLM response message (an AIMessage on cache hits).
+
+    Example:
+        >>> response = cached_invoke(llm, messages)
+        >>> response.content
+        '## AI PR Review Report...'
+    """
+    key = _cache_key(messages, model_name or llm.model_name)
+    cached = _lookup(key, ttl)
+    if cached is not None:
+        logger.info("llm_cache: Cache hit %.12s", key)
+        return cached
+
+    response = llm.invoke(messages)
+    _remember(key, response)
+    if LLM_CACHE_ENABLED:
+        _write(key, response)
+    return response
+
+
+async def cached_ainvoke(
+    llm, messages: list, model_name: str = None, ttl: int = DEFAULT_TTL
+):
+    """
+    Async variant of `cached_invoke` that awaits `llm.ainvoke` on a miss.
+
+    Args:
+        llm: The chat model client (e.g. ChatGroq).
+        messages: The chat messages to send.
+        model_name: Model identifier for the cache key. Defaults to
+            `llm.model_name`.
+        ttl: Maximum age of a reusable cache entry in seconds.
+
+    Returns:
+        The LLM response message (an AIMessage on cache hits).
+
+    Example:
+        >>> response = await cached_ainvoke(llm, messages)
+        >>> response.content
+        '```mermaid\\nclassDiagram...'
+    """
+    key = _cache_key(messages, model_name or llm.model_name)
+    cached = _lookup(key, ttl)
+    if cached is not None:
+        logger.info("llm_cache: Cache hit %.12s", key)
+        return cached
+
+    response = await llm.ainvoke(messages)
+    _remember(key, response)
+    if LLM_CACHE_ENABLED:
+        _write(key, response)
+    return response
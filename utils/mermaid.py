@@ -0,0 +1,74 @@
+"""Mermaid diagram validation shared by the diagram agent and supervisor.
+
+Keeping a single memoized validator means the supervisor re-checking the
+diagram produced by the diagram agent costs a dictionary lookup instead of
+another full scan.
+"""
+
+import re
+import functools
+
+# Pre-compiled pattern reused across every validation call
+_ERROR_RE = re.compile(
+    r"^\s*(?:Error:|I apologize|I cannot|I don't)",
+    re.MULTILINE | re.IGNORECASE,
+)
+
+# Delete table for bytes.translate: everything except "{" and "}"
+_OPEN_BRACE = ord("{")
+_NON_BRACE_BYTES = bytes(b for b in range(256) if b not in (0x7B, 0x7D))
+
+
+@functools.lru_cache(maxsize=64)
+def is_valid_mermaid_diagram(diagram_text: str) -> bool:
+    """
+    Validates that the diagram contains proper Mermaid classDiagram syntax.
+
+    Results are memoized per diagram text (up to 64 entries).
+
+    Args:
+        diagram_text: The diagram text to validate.
+
+    Returns:
+        bool: True if the diagram appears to be valid Mermaid code.
+
+    Checks:
+        - Presence of 'classDiagram' keyword
+        - Proper closing of all braces
+        - Absence of common error patterns
+
+    Example:
+        >>> is_valid_mermaid_diagram("classDiagram\\n    class User {}")
+        True
+        >>> is_valid_mermaid_diagram("Error: Invalid syntax")
+        False
+    """
+    if not diagram_text:
+        return False
+
+    # Check for classDiagram or graph keyword
+    if diagram_text.find("classDiagram") < 0 and diagram_text.find("graph") < 0:
+        return False
+
+    # Drop every non-brace byte in one C-level pass, then walk only the
+    # (ordered) residual: braces must balance and never close before opening
+    braces = diagram_text.encode("utf-8", "ignore").translate(
+        None, _NON_BRACE_BYTES
+    )
+    depth = 0
+    for byte in braces:
+        if byte == _OPEN_BRACE:
+            depth += 1
+        else:
+            depth -= 1
+            if depth < 0:
+                return False
+
+    if depth != 0:
+        return False
+
+    # Check for common error patterns (errors, apologies, refusals)
+    if _ERROR_RE.search(diagram_text):
+        return False
+
+    return True
@@ -0,0 +1,60 @@
+"""Prompt-building helpers shared by the agents.
+
+Keeps prompt assembly and context-window handling in one place so every
+agent lays out its request and trims the PR diff the same way before it is
+sent to the LLM.
+"""
+
+from .common import SYSTEM_MESSAGES
+
+TRUNCATION_MARKER = "\n...(middle truncated for context)...\n"
+
+
+def build_messages(role: str, instructions: str, content: str) -> list:
+    """
+    Builds the system and user chat messages for one agent request.
+
+    The user prompt puts the static instructions first and the per-PR
+    content last, so everything up to the content is byte-identical across
+    PRs and Groq's prompt cache can reuse it.
+
+    Args:
+        role: Key into SYSTEM_MESSAGES ("logic", "style", "diagram", ...).
+        instructions: Static task instructions for the agent.
+        content: Per-PR content (diff, findings) appended after them.
+
+    Returns:
+        list: System and user messages ready for the LLM.
+
+    Example:
+        >>> build_messages("logic", "Review this.", "+x = 1")[1]["content"]
+        'Review this.\\n\\n+x = 1'
+    """
+    user_prompt = f"{instructions}\n\n{content}"
+    return [SYSTEM_MESSAGES[role], {"role": "user", "content": user_prompt}]
+
+
+def truncate_for_context(text: str, limit: int) -> str:
+    """
+    Trims text to roughly `limit` characters, keeping its head and tail.
+
+    The tail of a diff often holds the most relevant change, so instead of
+    keeping only the first `limit` characters this keeps the first and last
+    `limit // 2` characters and drops the middle.
+
+    Args:
+        text: The text (usually a PR diff) to trim.
+        limit: Maximum number of characters kept from the original text.
+
+    Returns:
+        str: The original text if it fits, otherwise head + marker + tail.
+
+    Example:
+        >>> truncate_for_context("abcdefghij", 4)
+        'ab\\n...(middle truncated for context)...\\nij'
+    """
+    if len(text) <= limit:
+        return text
+
+    half = limit // 2
+    return text[:half] + TRUNCATION_MARKER + text[-half:]